@@ -1,99 +1,224 @@
-import streamlit as st
-import pandas as pd
-import matplotlib.pyplot as plt
-
-@st.cache_data
-def load_data():
-    data_path = 'DataSistemulEnergetic.csv'
-    data = pd.read_csv(data_path)
-    return data
-
-data = load_data()
-
-data['date'] = pd.to_datetime(data['date'])
-data['hour'] = data['date'].dt.hour
-data['day_of_week'] = data['date'].dt.day_name()
-data['month'] = data['date'].dt.month
-
-energy_types = ['carbune', 'hidro', 'hidrocarburi', 'nuclear', 'eolian', 'fotovolt', 'biomasa']
-
-st.title("Tabloul de bord al distribuției energiei")
-st.markdown("""
-    ## Explorați distribuția tipurilor de energie
-    Acest tablou de bord interactiv vizualizează distribuția diferitelor tipuri de energie pe întreaga perioadă a datasetului.
-""")
-
-st.subheader("Prezentare generală a datelor")
-st.write(data[['date', 'productie', 'sold'] + energy_types])
-
-st.subheader("Distribuția energiei pe tipuri")
-selected_types = st.multiselect("Selectați tipurile de energie pentru afișare:", options=energy_types, default=energy_types)
-
-fig, ax = plt.subplots(figsize=(10, 6))
-for energy_type in selected_types:
-    ax.plot(data['date'], data[energy_type], label=energy_type)
-
-ax.set_xlabel("Dată")
-ax.set_ylabel("Valoarea energiei")
-ax.set_title("Distribuția energiei în timp")
-ax.legend()
-st.pyplot(fig)
-
-st.subheader("Diagrama circulare volumitrica a distribuției energiei (valori totale)")
-total_values = data[selected_types].sum()
-fig, ax = plt.subplots()
-ax.pie(total_values, labels=total_values.index, autopct='%1.1f%%', startangle=90)
-ax.axis('equal')
-st.pyplot(fig)
-
-st.subheader("Valori maxime pe oră, zi a săptămânii și lună")
-
-hourly_peaks = data.groupby('hour')[selected_types].max()
-fig, ax = plt.subplots(figsize=(10, 6))
-hourly_peaks.plot(kind='bar', ax=ax)
-ax.set_xlabel("Ora")
-ax.set_ylabel("Valoarea maximă a energiei")
-ax.set_title("Valori maxime pe oră pentru fiecare tip de energie")
-st.pyplot(fig)
-
-daily_peaks = data.groupby('day_of_week')[selected_types].max()
-fig, ax = plt.subplots(figsize=(10, 6))
-daily_peaks.loc[['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']].plot(kind='bar', ax=ax)
-ax.set_xlabel("Ziua săptămânii")
-ax.set_ylabel("Valoarea maximă a energiei")
-ax.set_title("Valori maxime pe ziua săptămânii pentru fiecare tip de energie")
-st.pyplot(fig)
-
-monthly_peaks = data.groupby('month')[selected_types].max()
-fig, ax = plt.subplots(figsize=(10, 6))
-monthly_peaks.plot(kind='bar', ax=ax)
-ax.set_xlabel("Luna")
-ax.set_ylabel("Valoarea maximă a energiei")
-ax.set_title("Valori maxime pe lună pentru fiecare tip de energie")
-st.pyplot(fig)
-
-st.subheader("Serii temporale comparative pe oră, zi a săptămânii și lună pentru fiecare tip de energie")
-
-hourly_series = data.groupby('hour')[selected_types].mean()
-fig, ax = plt.subplots(figsize=(10, 6))
-hourly_series.plot(ax=ax)
-ax.set_xlabel("Ora")
-ax.set_ylabel("Valoarea medie a energiei")
-ax.set_title("Valoarea medie a energiei pe oră pentru fiecare tip de energie")
-st.pyplot(fig)
-
-daily_series = data.groupby('day_of_week')[selected_types].mean()
-fig, ax = plt.subplots(figsize=(10, 6))
-daily_series.loc[['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']].plot(ax=ax)
-ax.set_xlabel("Ziua săptămânii")
-ax.set_ylabel("Valoarea medie a energiei")
-ax.set_title("Valoarea medie a energiei pe ziua săptămânii pentru fiecare tip de energie")
-st.pyplot(fig)
-
-monthly_series = data.groupby('month')[selected_types].mean()
-fig, ax = plt.subplots(figsize=(10, 6))
-monthly_series.plot(ax=ax)
-ax.set_xlabel("Luna")
-ax.set_ylabel("Valoarea medie a energiei")
-ax.set_title("Valoarea medie a energiei pe lună pentru fiecare tip de energie")
-st.pyplot(fig)
+import io
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import streamlit as st
+import pandas as pd
+import matplotlib.pyplot as plt
+
+data_path = 'DataSistemulEnergetic.csv'
+energy_types = ['carbune', 'hidro', 'hidrocarburi', 'nuclear', 'eolian', 'fotovolt', 'biomasa']
+days_order = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+max_cached_figures = 64
+
+
+def dataset_version(path):
+    """Versiunea setului de date: se schimbă la orice modificare a fișierului."""
+    stat = os.stat(path)
+    return f"{stat.st_mtime_ns}-{stat.st_size}"
+
+
+def read_data(path):
+    data = pd.read_csv(path)
+    data['date'] = pd.to_datetime(data['date'])
+    data['hour'] = data['date'].dt.hour
+    data['day_of_week'] = data['date'].dt.day_name()
+    data['month'] = data['date'].dt.month
+    return data
+
+
+@st.cache_data
+def load_data(version):
+    return read_data(data_path)
+
+
+@st.cache_resource
+def figure_cache():
+    """
+    Cache LRU comun pentru imaginile PNG ale figurilor randate, cheia: (secțiune, versiune, tipuri).
+    Este partajat de toate sesiunile, de aceea orice acces se face sub blocarea returnată împreună cu el.
+    """
+    return OrderedDict(), threading.Lock()
+
+
+def compute_line(data, types):
+    return data.set_index('date')[types]
+
+
+def render_line(values):
+    fig, ax = plt.subplots(figsize=(10, 6))
+    for energy_type in values.columns:
+        ax.plot(values.index, values[energy_type], label=energy_type)
+    ax.set_xlabel("Dată")
+    ax.set_ylabel("Valoarea energiei")
+    ax.set_title("Distribuția energiei în timp")
+    ax.legend()
+    return fig
+
+
+def compute_pie(data, types):
+    return data[types].sum()
+
+
+def render_pie(total_values):
+    fig, ax = plt.subplots()
+    ax.pie(total_values, labels=total_values.index, autopct='%1.1f%%', startangle=90)
+    ax.axis('equal')
+    return fig
+
+
+def make_grouped_section(column, how, order=None):
+    def compute(data, types):
+        grouped = data.groupby(column)[types].agg(how)
+        return grouped.reindex(order) if order is not None else grouped
+    return compute
+
+
+def make_grouped_render(kind, xlabel, ylabel, title):
+    def render(grouped):
+        fig, ax = plt.subplots(figsize=(10, 6))
+        grouped.plot(kind=kind, ax=ax)
+        ax.set_xlabel(xlabel)
+        ax.set_ylabel(ylabel)
+        ax.set_title(title)
+        return fig
+    return render
+
+
+sections = {
+    'line': (compute_line, render_line),
+    'pie': (compute_pie, render_pie),
+    'hourly_peaks': (
+        make_grouped_section('hour', 'max'),
+        make_grouped_render('bar', "Ora", "Valoarea maximă a energiei",
+                            "Valori maxime pe oră pentru fiecare tip de energie")),
+    'daily_peaks': (
+        make_grouped_section('day_of_week', 'max', days_order),
+        make_grouped_render('bar', "Ziua săptămânii", "Valoarea maximă a energiei",
+                            "Valori maxime pe ziua săptămânii pentru fiecare tip de energie")),
+    'monthly_peaks': (
+        make_grouped_section('month', 'max'),
+        make_grouped_render('bar', "Luna", "Valoarea maximă a energiei",
+                            "Valori maxime pe lună pentru fiecare tip de energie")),
+    'hourly_series': (
+        make_grouped_section('hour', 'mean'),
+        make_grouped_render('line', "Ora", "Valoarea medie a energiei",
+                            "Valoarea medie a energiei pe oră pentru fiecare tip de energie")),
+    'daily_series': (
+        make_grouped_section('day_of_week', 'mean', days_order),
+        make_grouped_render('line', "Ziua săptămânii", "Valoarea medie a energiei",
+                            "Valoarea medie a energiei pe ziua săptămânii pentru fiecare tip de energie")),
+    'monthly_series': (
+        make_grouped_section('month', 'mean'),
+        make_grouped_render('line', "Luna", "Valoarea medie a energiei",
+                            "Valoarea medie a energiei pe lună pentru fiecare tip de energie")),
+}
+
+
+def render_png(render, values):
+    """
+    Randează figura în PNG (cu aceiași parametri ca st.pyplot) și o închide imediat:
+    în cache ajung doar octeții imaginii, nu figuri deschise în pyplot, folosite de mai multe sesiuni.
+    """
+    fig = render(values)
+    try:
+        buffer = io.BytesIO()
+        fig.savefig(buffer, format='png', bbox_inches='tight', dpi=200)
+        return buffer.getvalue()
+    finally:
+        plt.close(fig)
+
+
+def show_section(name, data, version, types, timings):
+    """Afișează secțiunea, calculând și randând figura doar dacă nu este deja în cache."""
+    cache, lock = figure_cache()
+    key = (name, version, tuple(types))
+    with lock:
+        entry = cache.get(key)
+        if entry is not None:
+            cache.move_to_end(key)
+    cached = entry is not None
+    if cached:
+        png, compute_time, render_time = entry
+    else:
+        # Calculul și randarea se fac în afara blocării, ca sesiunile să nu se aștepte una pe alta
+        compute, render = sections[name]
+        start = time.perf_counter()
+        values = compute(data, types)
+        compute_time = time.perf_counter() - start
+        start = time.perf_counter()
+        png = render_png(render, values)
+        render_time = time.perf_counter() - start
+        with lock:
+            cache[key] = (png, compute_time, render_time)
+            cache.move_to_end(key)
+            while len(cache) > max_cached_figures:
+                cache.popitem(last=False)
+
+    start = time.perf_counter()
+    st.image(png, width='stretch')
+    timings.append({
+        'Secțiune': name,
+        'Calcul (ms)': compute_time * 1000,
+        'Randare (ms)': render_time * 1000,
+        'Afișare (ms)': (time.perf_counter() - start) * 1000,
+        'Din cache': cached,
+    })
+
+
+def main():
+    version = dataset_version(data_path)
+    data = load_data(version)
+    timings = []
+
+    st.title("Tabloul de bord al distribuției energiei")
+    st.markdown("""
+        ## Explorați distribuția tipurilor de energie
+        Acest tablou de bord interactiv vizualizează distribuția diferitelor tipuri de energie pe întreaga perioadă a datasetului.
+    """)
+
+    st.subheader("Prezentare generală a datelor")
+    st.write(data[['date', 'productie', 'sold'] + energy_types])
+
+    st.subheader("Distribuția energiei pe tipuri")
+    selected_types = st.multiselect("Selectați tipurile de energie pentru afișare:", options=energy_types, default=energy_types)
+
+    # Secțiunile se randează doar când expanderul sau tabul este deschis
+    with st.expander("Distribuția energiei în timp", expanded=True, key='section_line', on_change='rerun') as section:
+        if section.open:
+            show_section('line', data, version, selected_types, timings)
+
+    with st.expander("Diagrama circulare volumitrica a distribuției energiei (valori totale)",
+                     key='section_pie', on_change='rerun') as section:
+        if section.open:
+            show_section('pie', data, version, selected_types, timings)
+
+    with st.expander("Valori maxime pe oră, zi a săptămânii și lună", key='section_peaks', on_change='rerun') as section:
+        if section.open:
+            tabs = st.tabs(["Oră", "Ziua săptămânii", "Lună"], key='tabs_peaks', on_change='rerun')
+            for tab, name in zip(tabs, ['hourly_peaks', 'daily_peaks', 'monthly_peaks']):
+                with tab:
+                    if tab.open:
+                        show_section(name, data, version, selected_types, timings)
+
+    with st.expander("Serii temporale comparative pe oră, zi a săptămânii și lună pentru fiecare tip de energie",
+                     key='section_series', on_change='rerun') as section:
+        if section.open:
+            tabs = st.tabs(["Oră", "Ziua săptămânii", "Lună"], key='tabs_series', on_change='rerun')
+            for tab, name in zip(tabs, ['hourly_series', 'daily_series', 'monthly_series']):
+                with tab:
+                    if tab.open:
+                        show_section(name, data, version, selected_types, timings)
+
+    if st.sidebar.checkbox("Panou de depanare (timpi pe secțiuni)"):
+        st.sidebar.markdown("### Timpi pe secțiuni")
+        if timings:
+            st.sidebar.dataframe(pd.DataFrame(timings).round(2), hide_index=True)
+        else:
+            st.sidebar.write("Nicio secțiune deschisă.")
+
+
+if __name__ == "__main__":
+    main()
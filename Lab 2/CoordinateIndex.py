@@ -0,0 +1,119 @@
+from collections import Counter, defaultdict
+
+import pandas as pd
+
+# Канонические формы префиксов населённых пунктов
+PREFIXES = {
+    'com': 'com', 'comuna': 'com',
+    's': 's', 'sat': 's', 'satul': 's',
+    'or': 'or', 'oras': 'or', 'orasul': 'or',
+    'orasel': 'orasel',
+    'mun': 'mun', 'municipiul': 'mun',
+    'sector': 'sector',
+    'uta': 'uta',
+}
+
+
+def normalize_names(names):
+    """
+    Нормализует названия: регистр, диакритика (Ţ/Ț, Ş/Ș, Ă, Î, Â), пунктуация и пробелы.
+    Возвращает DataFrame с колонками 'prefix' (канонический префикс или '') и 'base' (название без префикса).
+    """
+    normalized = (
+        pd.Series(names, dtype='object').fillna('').astype(str)
+        .str.normalize('NFKD')
+        .str.encode('ascii', errors='ignore').str.decode('ascii')
+        .str.lower()
+        .str.replace(r'[^a-z0-9]+', ' ', regex=True)
+        .str.strip()
+    )
+    parts = normalized.str.split(' ', n=1, expand=True).reindex(columns=[0, 1])
+    prefix = parts[0].map(PREFIXES)
+    has_prefix = prefix.notna() & parts[1].notna()
+    result = pd.DataFrame(index=normalized.index)
+    result['prefix'] = prefix.where(has_prefix, '')
+    result['base'] = parts[1].where(has_prefix, normalized)
+    return result
+
+
+def trigrams(text):
+    """Множество триграмм строки с пробелами по краям."""
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def build_coordinate_index(coordinates_df):
+    """
+    Строит индекс координат: хеш-таблицу по нормализованному ключу 'префикс название',
+    вторичный индекс по названию без префикса (только однозначные) и триграммный индекс
+    для нечёткого поиска.
+    """
+    coords = coordinates_df[['city', 'longitude', 'latitude']].reset_index(drop=True)
+    coords = pd.concat([coords, normalize_names(coords['city'])], axis=1)
+    coords['key'] = (coords['prefix'] + ' ' + coords['base']).str.strip()
+
+    # Первое совпадение, как и при прежнем поиске через iloc[0]
+    by_key = coords.drop_duplicates('key').set_index('key')
+    by_base = coords.drop_duplicates('base', keep=False).set_index('base')
+
+    postings = defaultdict(list)
+    sizes = []
+    for row_id, base in enumerate(coords['base']):
+        grams = trigrams(base)
+        sizes.append(len(grams))
+        for gram in grams:
+            postings[gram].append(row_id)
+
+    return {
+        'coords': coords,
+        'by_key': by_key[['city', 'longitude', 'latitude']],
+        'by_base': by_base[['city', 'longitude', 'latitude']],
+        'postings': dict(postings),
+        'sizes': sizes,
+    }
+
+
+def fuzzy_lookup(base, index, threshold=0.6):
+    """Ищет ближайшее название по коэффициенту Жаккара триграмм. Возвращает (номер строки, оценка) или None."""
+    grams = trigrams(base)
+    overlaps = Counter()
+    for gram in grams:
+        overlaps.update(index['postings'].get(gram, ()))
+    best = None
+    for row_id, overlap in overlaps.items():
+        score = overlap / (len(grams) + index['sizes'][row_id] - overlap)
+        if score >= threshold and (best is None or score > best[1]):
+            best = (row_id, score)
+    return best
+
+
+def match_coordinates(localities, index, threshold=0.6):
+    """
+    Сопоставляет населённые пункты с координатами: точный ключ, затем название без префикса,
+    затем нечёткий поиск по триграммам. Возвращает по одной строке на уникальное название
+    с колонками 'Localitate', 'city', 'longitude', 'latitude', 'Potrivire' и 'Scor'.
+    """
+    names = pd.Series(pd.unique(pd.Series(localities).dropna()), name='Localitate')
+    matches = pd.concat([names, normalize_names(names)], axis=1)
+    matches['key'] = (matches['prefix'] + ' ' + matches['base']).str.strip()
+
+    matches = matches.merge(index['by_key'], left_on='key', right_index=True, how='left')
+    matches['Potrivire'] = matches['city'].notna().map({True: 'exact', False: None})
+    matches['Scor'] = matches['city'].notna().astype(float)
+
+    missing = matches['city'].isna()
+    by_base = matches.loc[missing, ['base']].merge(index['by_base'], left_on='base', right_index=True, how='inner')
+    matches.loc[by_base.index, ['city', 'longitude', 'latitude']] = by_base[['city', 'longitude', 'latitude']]
+    matches.loc[by_base.index, 'Potrivire'] = 'nume'
+    matches.loc[by_base.index, 'Scor'] = 1.0
+
+    coords = index['coords']
+    for row in matches.index[matches['city'].isna()]:
+        found = fuzzy_lookup(matches.at[row, 'base'], index, threshold)
+        if found is not None:
+            row_id, score = found
+            matches.loc[row, ['city', 'longitude', 'latitude']] = coords.loc[row_id, ['city', 'longitude', 'latitude']].values
+            matches.at[row, 'Potrivire'] = 'aproximativ'
+            matches.at[row, 'Scor'] = score
+
+    return matches[['Localitate', 'city', 'longitude', 'latitude', 'Potrivire', 'Scor']]
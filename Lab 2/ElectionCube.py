@@ -0,0 +1,71 @@
+import numpy as np
+
+# Уровни иерархии от общего к детальному и ключи каждого уровня
+LEVELS = ['Național', 'Circumscripție', 'Localitate', 'Secție']
+LEVEL_KEYS = {
+    'Național': [],
+    'Circumscripție': ['Circumscripție'],
+    'Localitate': ['Circumscripție', 'Localitate'],
+    'Secție': ['Circumscripție', 'Localitate', 'Nr. secție'],
+}
+
+
+def summarize_level(totals, candidates, valid_column, voters_column, registered_column):
+    """Добавляет к суммам уровня доли кандидатов, явку и победителя (векторно, без циклов по строкам)."""
+    summary = totals.copy()
+    valid = totals[valid_column].replace(0, np.nan)
+    shares = totals[candidates].div(valid, axis=0) * 100
+    summary[[f'{candidate} (%)' for candidate in candidates]] = shares.to_numpy()
+    summary['Prezență (%)'] = totals[voters_column] / totals[registered_column].replace(0, np.nan) * 100
+    votes = totals[candidates].to_numpy()
+    summary['Candidat câștigător'] = np.asarray(candidates)[votes.argmax(axis=1)]
+    return summary
+
+
+def build_election_cube(stations, candidates, valid_column, voters_column, registered_column, top_k=3):
+    """
+    Строит куб свёрток результатов: секция → населённый пункт → округ → страна.
+    Каждый уровень сворачивается из предыдущего, доли, явка, победитель и порядок по числу
+    действительных голосов считаются один раз на уровень, поэтому переход между уровнями — поиск по индексу.
+    """
+    measures = [registered_column, voters_column, valid_column]
+    totals = stations.groupby(LEVEL_KEYS['Secție'], dropna=False)[measures + candidates].sum()
+
+    cube = {'candidates': list(candidates)}
+    for level in reversed(LEVELS):
+        keys = LEVEL_KEYS[level]
+        if keys:
+            totals = totals.groupby(level=keys, dropna=False).sum()
+        else:
+            totals = totals.sum().to_frame('Total').T
+            totals.index.name = 'Național'
+        summary = summarize_level(totals, candidates, valid_column, voters_column, registered_column)
+        cube[level] = {
+            'table': summary,
+            'order': np.argsort(-summary[valid_column].to_numpy(), kind='stable'),
+        }
+
+    # Ведущие кандидаты страны и победитель среди них на каждом уровне
+    national = cube['Național']['table'].iloc[0]
+    top_candidates = list(national[candidates].sort_values(ascending=False).index[:top_k])
+    cube['top_candidates'] = top_candidates
+    for level in LEVELS:
+        table = cube[level]['table']
+        votes = table[top_candidates].to_numpy()
+        table[f'Câștigător top-{top_k}'] = np.asarray(top_candidates)[votes.argmax(axis=1)]
+    cube['valid_column'] = valid_column
+    return cube
+
+
+def drill_down(cube, level, parent=()):
+    """Возвращает строки уровня level, принадлежащие родителю parent (кортеж ключей родительского уровня)."""
+    table = cube[level]['table']
+    if not parent:
+        return table
+    keys = LEVEL_KEYS[level]
+    return table.xs(tuple(parent), level=keys[:len(parent)], drop_level=False)
+
+
+def top_k(cube, level, k=5):
+    """Первые k строк уровня по числу действительных голосов по заранее вычисленному порядку."""
+    return cube[level]['table'].iloc[cube[level]['order'][:k]]
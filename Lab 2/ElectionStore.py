@@ -0,0 +1,100 @@
+import json
+import os
+
+import pandas as pd
+
+from CoordinateIndex import normalize_names
+
+STORE_DIR = 'elections'
+MANIFEST = 'manifest.json'
+LOCALITY_COLUMNS = ['Alegători înscriși', 'Numărul de alegători care au participat la votare', 'Total voturi valabil exprimate']
+
+
+def read_manifest(store_dir=STORE_DIR):
+    """Список загруженных выборов: id → метка и отпечаток исходного файла."""
+    path = os.path.join(store_dir, MANIFEST)
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r', encoding='utf-8') as file:
+        return json.load(file)
+
+
+def write_manifest(manifest, store_dir=STORE_DIR):
+    temp_path = os.path.join(store_dir, f"{MANIFEST}.tmp")
+    with open(temp_path, 'w', encoding='utf-8') as file:
+        json.dump(manifest, file, ensure_ascii=False, indent=2)
+    os.replace(temp_path, os.path.join(store_dir, MANIFEST))
+
+
+def is_ingested(election_id, fingerprint, store_dir=STORE_DIR):
+    return read_manifest(store_dir).get(election_id, {}).get('fingerprint') == fingerprint
+
+
+def locality_keys(circumscriptions, localities):
+    """Ключ населённого пункта для сравнения выборов: номер округа и нормализованное название."""
+    number = circumscriptions.str.extract(r'^\s*(\d+)')[0].fillna('')
+    names = normalize_names(localities)
+    return number + '|' + (names['prefix'] + ' ' + names['base']).str.strip()
+
+
+def ingest_election(election_id, stations, candidates, label, fingerprint, store_dir=STORE_DIR):
+    """
+    Загружает одни выборы в хранилище: секции сворачиваются до населённых пунктов и записываются
+    в отдельный раздел Parquet (итоги по пунктам и голоса кандидатов в длинном формате).
+    Остальные разделы не перечитываются и не перезаписываются.
+    """
+    localities = (stations.groupby(['Circumscripție', 'Localitate'])[LOCALITY_COLUMNS + list(candidates)]
+                  .sum().reset_index())
+    localities.insert(0, 'Cheie', locality_keys(localities['Circumscripție'], localities['Localitate']))
+    localities = localities.groupby('Cheie', as_index=False).agg(
+        {'Circumscripție': 'first', 'Localitate': 'first', **{column: 'sum' for column in LOCALITY_COLUMNS + list(candidates)}})
+
+    votes = localities.melt(id_vars=['Cheie'], value_vars=list(candidates), var_name='Candidat', value_name='Voturi')
+    votes['Candidat'] = votes['Candidat'].astype('category')
+    votes['Voturi'] = votes['Voturi'].astype('int64')
+    totals = localities[['Cheie', 'Circumscripție', 'Localitate'] + LOCALITY_COLUMNS].astype(
+        {column: 'int64' for column in LOCALITY_COLUMNS})
+
+    partition_dir = os.path.join(store_dir, election_id)
+    os.makedirs(partition_dir, exist_ok=True)
+    totals.to_parquet(os.path.join(partition_dir, 'localitati.parquet'), index=False)
+    votes.to_parquet(os.path.join(partition_dir, 'voturi.parquet'), index=False)
+
+    manifest = read_manifest(store_dir)
+    manifest[election_id] = {'label': label, 'fingerprint': fingerprint, 'candidates': list(candidates)}
+    write_manifest(manifest, store_dir)
+
+
+def load_localities(election_id, store_dir=STORE_DIR):
+    return pd.read_parquet(os.path.join(store_dir, election_id, 'localitati.parquet')).set_index('Cheie')
+
+
+def load_shares(election_id, store_dir=STORE_DIR):
+    """Доли кандидатов (%) по населённым пунктам: строки — ключи, колонки — кандидаты."""
+    votes = pd.read_parquet(os.path.join(store_dir, election_id, 'voturi.parquet'))
+    valid = load_localities(election_id, store_dir)['Total voturi valabil exprimate']
+    shares = votes.pivot(index='Cheie', columns='Candidat', values='Voturi')
+    shares.columns = shares.columns.astype(str)
+    return shares.div(valid.reindex(shares.index).replace(0, pd.NA), axis=0).astype('float64') * 100
+
+
+def turnout_change(base_id, other_id, store_dir=STORE_DIR):
+    """Явка в двух выборах и её изменение (п.п.) по населённым пунктам, найденным в обоих разделах."""
+    base = load_localities(base_id, store_dir)
+    other = load_localities(other_id, store_dir)
+    turnout_base = base['Numărul de alegători care au participat la votare'] / base['Alegători înscriși'].replace(0, pd.NA) * 100
+    turnout_other = other['Numărul de alegători care au participat la votare'] / other['Alegători înscriși'].replace(0, pd.NA) * 100
+    result = base[['Circumscripție', 'Localitate']].join(
+        pd.DataFrame({'Prezență bază (%)': turnout_base, 'Prezență comparată (%)': turnout_other}), how='inner')
+    result = result.dropna(subset=['Prezență comparată (%)'])
+    result['Schimbare prezență (p.p.)'] = result['Prezență comparată (%)'] - result['Prezență bază (%)']
+    return result
+
+
+def candidate_swing(base_id, other_id, store_dir=STORE_DIR):
+    """Изменение доли (п.п.) каждого кандидата, участвовавшего в обоих выборах, по населённым пунктам."""
+    base = load_shares(base_id, store_dir)
+    other = load_shares(other_id, store_dir)
+    common = base.columns.intersection(other.columns)
+    keys = base.index.intersection(other.index)
+    return other.loc[keys, common] - base.loc[keys, common]
@@ -0,0 +1,73 @@
+import openpyxl
+import pandas as pd
+from openpyxl.utils import column_index_from_string
+
+
+def parse_usecols(usecols):
+    """Преобразует диапазон колонок вида "A:D" в номера (min_col, max_col), начиная с 1."""
+    if usecols is None:
+        return 1, None
+    first, _, last = usecols.partition(':')
+    return column_index_from_string(first), column_index_from_string(last or first)
+
+
+def stream_excel(path, columns, skiprows=0, usecols=None, ffill=(), numeric=(), chunk_size=10000, sheet=0):
+    """
+    Потоково читает лист Excel в режиме read-only и выдаёт типизированные DataFrame по chunk_size строк.
+    Повторяет семантику pd.read_excel(header=None, skiprows=..., usecols="A:D"), а колонки из ffill
+    заполняются последним непустым значением прямо при чтении, в том числе через границы блоков.
+    Память ограничена размером блока, а не размером книги.
+    """
+    min_col, max_col = parse_usecols(usecols)
+    ffill_positions = [columns.index(column) for column in ffill]
+    last_values = {position: None for position in ffill_positions}
+
+    workbook = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    try:
+        worksheet = workbook.worksheets[sheet] if isinstance(sheet, int) else workbook[sheet]
+        rows = []
+        pending_empty = 0  # Пустые строки выдаются только если за ними есть данные, как в pandas
+        for values in worksheet.iter_rows(min_row=skiprows + 1, min_col=min_col, max_col=max_col, values_only=True):
+            values = list(values) + [None] * (len(columns) - len(values))
+            if all(value is None for value in values):
+                pending_empty += 1
+                continue
+            for _ in range(pending_empty):
+                rows.append([last_values.get(i) for i in range(len(columns))])
+            pending_empty = 0
+
+            for position in ffill_positions:
+                if values[position] is None:
+                    values[position] = last_values[position]
+                else:
+                    last_values[position] = values[position]
+            rows.append(values)
+
+            if len(rows) >= chunk_size:
+                yield make_chunk(rows, columns, numeric)
+                rows = []
+        if rows:
+            yield make_chunk(rows, columns, numeric)
+    finally:
+        workbook.close()
+
+
+def make_chunk(rows, columns, numeric):
+    """Собирает блок строк в DataFrame с числовыми колонками float64."""
+    chunk = pd.DataFrame(rows, columns=columns)
+    for column in numeric:
+        chunk[column] = pd.to_numeric(chunk[column], errors='coerce').astype('float64')
+    return chunk
+
+
+def read_excel_streaming(path, columns, dropna=None, **kwargs):
+    """Собирает потоковые блоки в одну таблицу, отбрасывая строки без значений в колонках dropna."""
+    chunks = []
+    for chunk in stream_excel(path, columns, **kwargs):
+        if dropna:
+            chunk = chunk.dropna(subset=dropna)
+        chunks.append(chunk)
+    if not chunks:
+        return pd.DataFrame({column: pd.Series(dtype='float64' if column in kwargs.get('numeric', ()) else 'object')
+                             for column in columns})
+    return pd.concat(chunks, ignore_index=True)
@@ -1,11 +1,21 @@
 import matplotlib.patches as mpatches
 import json
+import os
+import numpy as np
 import pandas as pd
 import streamlit as st
 import matplotlib.pyplot as plt
 import seaborn as sns
 import geopandas as gpd
-from shapely.geometry import Point
+import ExcelStream
+from concurrent.futures import ThreadPoolExecutor
+from CoordinateIndex import build_coordinate_index, match_coordinates
+from ExcelStream import read_excel_streaming
+from ElectionStore import candidate_swing, ingest_election, is_ingested, read_manifest, turnout_change
+from ElectionCube import LEVELS, build_election_cube, drill_down, top_k
+from MapEngine import load_map_engine, make_viewport, match_polygons, project_points, query_point, render_choropleth
+from PopulationCube import build_cube, build_population_table, cube_slice
+from Snapshots import file_fingerprint, file_version, load_snapshot
 
 # Настройка страницы
 st.set_page_config(page_title="Dashboard Rezultatele Alegerilor", layout="wide")
@@ -14,6 +24,18 @@ st.set_page_config(page_title="Dashboard Rezultatele Alegerilor", layout="wide")
 st.markdown("<h1 style='text-align: center; color: #1E90FF;'>Rezultatele Alegerilor pentru Funcția de Președinte</h1>", unsafe_allow_html=True)
 st.divider()
 file_path_alegeri = 'Выборы.xlsx'
+file_path_populatie = 'pop010400rclreg_20241110-194246.xlsx'
+file_path_regiuni = 'mun010900reg_20241117-163538.xlsx'
+file_path_coordinates = 'coordinates.json'
+
+# Локальный файл границ районов/коммун для картограммы и колонка с названием
+file_path_boundaries = 'boundaries.geojson'
+boundaries_name_column = 'name'
+# Колонка района в файле границ (None — нет): различает одноимённые коммуны разных районов
+boundaries_group_column = None
+
+age_order = ['0-4', '5-9', '10-14', '15-19', '20-24', '25-29', '30-34', '35-39',
+             '40-44', '45-49', '50-54', '55-59', '60-64', '65-69', '70-74', '75 peste']
 
 columns_mapping = {
     'Localitatea': 'Localitate',
@@ -31,57 +53,194 @@ columns_mapping = {
     'Ulianovschi\nTudor': 'Tudor Ulianovschi',
     'Morari\nNatalia': 'Natalia Morari'
 }
+candidate_columns = list(columns_mapping.values())[3:]
+
+# Дополнительные колонки для свёртки по уровням (секция, округ, явка)
+station_columns_mapping = {
+    'Nr.sec.': 'Nr. secție',
+    'a) numărul de alegători \nînscriși în listele electorale \nde bază': 'Alegători în listele de bază',
+    'b) numărul de alegători \nînscriși în listele \nelectorale suplimentare ': 'Alegători în listele suplimentare',
+}
+
+# Выборы для сравнения: каждый файл загружается в хранилище один раз (добавьте второй тур или другой год)
+elections = {
+    'prezidentiale-2024-tur1': {
+        'label': 'Alegeri prezidențiale 2024, turul I',
+        'file': file_path_alegeri,
+        'columns': columns_mapping,
+    },
+}
+
+
+def read_election(path, mapping):
+    data_alegeri = pd.read_excel(path, sheet_name=0)
+    data_alegeri = data_alegeri.rename(columns={**mapping, **station_columns_mapping})
+    data_alegeri = data_alegeri[list(mapping.values()) + list(station_columns_mapping.values())]
+    for column in data_alegeri.columns[1:]:
+        data_alegeri[column] = pd.to_numeric(data_alegeri[column], errors='coerce')
+    data_alegeri['Alegători înscriși'] = (data_alegeri.pop('Alegători în listele de bază').fillna(0)
+                                          + data_alegeri.pop('Alegători în listele suplimentare').fillna(0))
+
+    # Округ каждой секции — последний заголовок 'Circumscripţia ...' выше неё
+    is_circumscription = data_alegeri['Localitate'].str.contains('Circumscrip', na=False)
+    data_alegeri['Circumscripție'] = (data_alegeri['Localitate'].where(is_circumscription).ffill()
+                                      .str.replace(r'\s+', ' ', regex=True))
+    return data_alegeri
+
+
+def read_alegeri(path):
+    return read_election(path, columns_mapping)
+
+
+def election_stations(data_alegeri):
+    return data_alegeri[~data_alegeri['Localitate'].str.contains('Circumscrip|Alegeri prezidențiale', na=True)]
+
+
+def read_populatie(path):
+    # Потоковое чтение: skiprows/usecols и заполнение иерархии выполняются построчно
+    return read_excel_streaming(path, ['Localitate', 'Vârstă', 'Gen', 'Valoare'], skiprows=3, usecols="A:D",
+                                ffill=['Localitate', 'Vârstă'], numeric=['Valoare'])
+
+
+def read_regiuni(path):
+    return read_excel_streaming(path, ['Localitate', 'Relația cu piața forței de muncă', 'Nivel de instruire', 'Gen',
+                                       'Grupe de vârstă', 'Valoare'], skiprows=3, usecols="A:F",
+                                ffill=['Localitate', 'Relația cu piața forței de muncă', 'Nivel de instruire', 'Gen'],
+                                numeric=['Valoare'], dropna=['Grupe de vârstă'])
+
+
+def read_coordinates(path):
+    with open(path, 'r') as file:
+        return pd.DataFrame(json.load(file))
+
+
+# Снимки Parquet по хешу содержимого и кода чтения; при первом запуске файлы читаются параллельно.
+# В зависимостях перечислено всё, что влияет на таблицу снимка, кроме самой функции чтения
+@st.cache_data
+def load_inputs(versions):
+    sources = {
+        'alegeri': (file_path_alegeri, read_alegeri, (read_election, columns_mapping, station_columns_mapping)),
+        'populatie': (file_path_populatie, read_populatie, (ExcelStream,)),
+        'regiuni': (file_path_regiuni, read_regiuni, (ExcelStream,)),
+        'coordinates': (file_path_coordinates, read_coordinates, ()),
+    }
+    with ThreadPoolExecutor(max_workers=len(sources)) as executor:
+        futures = {name: executor.submit(load_snapshot, path, build, name, depends)
+                   for name, (path, build, depends) in sources.items()}
+        return {name: future.result() for name, future in futures.items()}
+
 
-data_alegeri = pd.read_excel(file_path_alegeri, sheet_name=0)
-data_alegeri = data_alegeri.rename(columns=columns_mapping)
-data_alegeri = data_alegeri[list(columns_mapping.values())]
+# Категориальные таблицы под MultiIndex и куб итогов по всем сочетаниям измерений
+@st.cache_data
+def load_population_cube(versions, name, dimensions):
+    table, memory = build_population_table(load_inputs(versions)[name], dimensions, {'Vârstă': age_order})
+    return table, build_cube(table), memory
 
-data_filtered = data_alegeri[~data_alegeri['Localitate'].str.contains('Circumscrip|Alegeri prezidențiale', na=True)]
-for column in data_filtered.columns[1:]:
-    data_filtered[column] = pd.to_numeric(data_filtered[column], errors='coerce')
-data_grouped = data_filtered.groupby('Localitate').sum().reset_index()
 
-st.write(data_grouped)
+def show_memory_report(memory):
+    st.caption(f"Memorie: {memory['before'] / 1024:.1f} KB → {memory['after'] / 1024:.1f} KB "
+               f"({1 - memory['after'] / memory['before']:.0%} mai puțin)")
+
+
+@st.cache_data
+def load_election_cube(versions):
+    stations = election_stations(load_inputs(versions)['alegeri'])
+    return build_election_cube(stations, candidate_columns, 'Total voturi valabil exprimate',
+                               'Numărul de alegători care au participat la votare', 'Alegători înscriși')
+
+
+# Загружаются только новые или изменившиеся выборы, остальные разделы не трогаются
+@st.cache_data
+def sync_election_store(election_versions):
+    for election_id, election in elections.items():
+        if not os.path.exists(election['file']):
+            continue
+        fingerprint = file_fingerprint(election['file'])
+        if is_ingested(election_id, fingerprint):
+            continue
+        stations = election_stations(read_election(election['file'], election['columns']))
+        candidates = list(election['columns'].values())[3:]
+        ingest_election(election_id, stations, candidates, election['label'], fingerprint)
+    return read_manifest()
+
+
+@st.cache_resource
+def load_boundaries_engine(version):
+    return load_map_engine(file_path_boundaries, boundaries_name_column, group_column=boundaries_group_column)
+
+
+versions = tuple(file_version(path) for path in
+                 [file_path_alegeri, file_path_populatie, file_path_regiuni, file_path_coordinates])
+inputs = load_inputs(versions)
+election_cube = load_election_cube(versions)
+data_grouped = election_cube['Localitate']['table'].reset_index()
+
+# Детализация по уровням: выбор уровня и родителя — поиск в готовом кубе
+level = st.selectbox("Nivel de agregare", LEVELS, index=LEVELS.index('Localitate'))
+parent = ()
+if level in ('Localitate', 'Secție'):
+    circumscriptions = election_cube['Circumscripție']['table'].index
+    circumscription = st.selectbox("Circumscripție", ['Toate'] + list(circumscriptions))
+    if circumscription != 'Toate':
+        parent = (circumscription,)
+        if level == 'Secție':
+            localities = drill_down(election_cube, 'Localitate', parent).index.get_level_values('Localitate')
+            locality = st.selectbox("Localitate", ['Toate'] + list(localities))
+            if locality != 'Toate':
+                parent = (circumscription, locality)
+st.write(drill_down(election_cube, level, parent))
 
 # Графики для таблицы 1
 with st.expander("Distribuția voturilor pe candidați"):
     st.markdown("<h3 style='color: #32CD32;'>Distribuția Voturilor pe Candidați</h3>", unsafe_allow_html=True)
     fig, ax = plt.subplots(figsize=(12, 6))
-    filtered_data = data_grouped.drop(columns=['Numărul de alegători care au participat la votare',
-                                               'Total voturi valabil exprimate'])
-    filtered_data.iloc[:, 1:].sum().plot(kind='bar', ax=ax)
+    election_cube['Național']['table'].iloc[0][candidate_columns].plot(kind='bar', ax=ax)
     ax.set_ylabel("Număr de voturi")
     plt.tight_layout()
     st.pyplot(fig)
 
 with st.expander("Top 5 localități cu cele mai multe voturi exprimate"):
     st.markdown("<h3 style='color: #32CD32;'>Top 5 localități cu cele mai multe voturi exprimate</h3>", unsafe_allow_html=True)
-    top5 = data_grouped.nlargest(5, 'Total voturi valabil exprimate')
+    top5 = top_k(election_cube, 'Localitate', 5).reset_index()
     fig, ax = plt.subplots(figsize=(12, 6))
     sns.barplot(data=top5, x='Localitate', y='Total voturi valabil exprimate', ax=ax, palette='dark')
     plt.tight_layout()
     st.pyplot(fig)
 
+# Сравнение выборов: явка и сдвиги по населённым пунктам из хранилища
+with st.expander("Comparație între alegeri"):
+    stored_elections = sync_election_store(tuple(
+        file_version(election['file']) if os.path.exists(election['file']) else None for election in elections.values()))
+    if len(stored_elections) < 2:
+        st.info("Pentru comparație adăugați încă un scrutin (de ex. turul II) în lista 'elections'.")
+    else:
+        labels = {election_id: info['label'] for election_id, info in stored_elections.items()}
+        base_id = st.selectbox("Scrutin de bază", list(labels), format_func=labels.get)
+        other_id = st.selectbox("Scrutin comparat", [election_id for election_id in labels if election_id != base_id],
+                                format_func=labels.get)
+        turnout = turnout_change(base_id, other_id)
+        st.markdown("**Schimbarea prezenței pe localități**")
+        st.dataframe(turnout.sort_values('Schimbare prezență (p.p.)'))
+        swing = candidate_swing(base_id, other_id)
+        if swing.empty:
+            st.write("Niciun candidat comun între cele două scrutine.")
+        else:
+            st.markdown("**Schimbarea cotei candidaților (p.p.)**")
+            st.dataframe(turnout[['Circumscripție', 'Localitate']].join(swing, how='inner'))
+
 # Таблица 2: Populația pe raioane, grupe de vârstă și sexe
 st.markdown("<h1 style='text-align: center; color: #1E90FF;'>Populația pe Raioane și Grupe de Vârstă</h1>", unsafe_allow_html=True)
 st.divider()
-file_path_populatie = 'pop010400rclreg_20241110-194246.xlsx'
 
-data_populatie = pd.read_excel(file_path_populatie, header=None, skiprows=3, usecols="A:D")
-data_populatie.columns = ['Localitate', 'Vârstă', 'Gen', 'Valoare']
-data_populatie['Localitate'].fillna(method='ffill', inplace=True)
-data_populatie['Vârstă'].fillna(method='ffill', inplace=True)
-data_populatie['Valoare'] = pd.to_numeric(data_populatie['Valoare'], errors='coerce')
+data_populatie, cube_populatie, memory_populatie = load_population_cube(
+    versions, 'populatie', ['Localitate', 'Vârstă', 'Gen'])
 st.write(data_populatie)
+show_memory_report(memory_populatie)
 
 # Графики для таблицы 2
 with st.expander("Distribuția populației pe grupe de vârstă"):
     st.markdown("<h3 style='color: #32CD32;'>Distribuția Populației pe Grupe de Vârstă</h3>", unsafe_allow_html=True)
-    age_order = ['0-4', '5-9', '10-14', '15-19', '20-24', '25-29', '30-34', '35-39',
-                 '40-44', '45-49', '50-54', '55-59', '60-64', '65-69', '70-74', '75 peste']
-    aggregated_data = data_populatie.groupby(['Vârstă', 'Gen'])['Valoare'].sum().reset_index()
-    aggregated_data['Vârstă'] = pd.Categorical(aggregated_data['Vârstă'], categories=age_order, ordered=True)
-    aggregated_data = aggregated_data.sort_values('Vârstă')
+    aggregated_data = cube_slice(cube_populatie, 'Vârstă', 'Gen')
     fig, ax = plt.subplots(figsize=(12, 6))
     sns.barplot(data=aggregated_data, x='Vârstă', y='Valoare', hue='Gen', ax=ax, palette='dark', ci=None)
     ax.set_ylabel("Populație")
@@ -90,7 +249,8 @@ with st.expander("Distribuția populației pe grupe de vârstă"):
 
 with st.expander("Top 5 grupe de vârstă cu cea mai mare populație"):
     st.markdown("<h3 style='color: #32CD32;'>Top 5 grupe de vârstă cu cea mai mare populație</h3>", unsafe_allow_html=True)
-    top5_age = data_populatie.groupby('Vârstă')['Valoare'].sum().nlargest(5).reset_index()
+    top5_age = cube_slice(cube_populatie, 'Vârstă').nlargest(5, 'Valoare')
+    top5_age['Vârstă'] = top5_age['Vârstă'].astype(str)
     fig, ax = plt.subplots(figsize=(12, 6))
     sns.barplot(data=top5_age, x='Vârstă', y='Valoare', ax=ax, palette='dark')
     plt.tight_layout()
@@ -99,23 +259,17 @@ with st.expander("Top 5 grupe de vârstă cu cea mai mare populație"):
 # Таблица 3: Populația pe regiuni statistice
 st.markdown("<h1 style='text-align: center; color: #1E90FF;'>Populația pe regiuni statistice, relația cu piața forței de muncă și grupe de vârstă (2023)</h1>", unsafe_allow_html=True)
 st.divider()
-file_path_regiuni = 'mun010900reg_20241117-163538.xlsx'
 
-data_regiuni = pd.read_excel(file_path_regiuni, header=None, skiprows=3, usecols="A:F")
-data_regiuni.columns = ['Localitate', 'Relația cu piața forței de muncă', 'Nivel de instruire', 'Gen', 'Grupe de vârstă', 'Valoare']
-data_regiuni['Localitate'].fillna(method='ffill', inplace=True)
-data_regiuni['Relația cu piața forței de muncă'].fillna(method='ffill', inplace=True)
-data_regiuni['Nivel de instruire'].fillna(method='ffill', inplace=True)
-data_regiuni['Gen'].fillna(method='ffill', inplace=True)
-data_regiuni['Valoare'] = pd.to_numeric(data_regiuni['Valoare'], errors='coerce')
-data_regiuni = data_regiuni.dropna(subset=['Grupe de vârstă'])
+data_regiuni, cube_regiuni, memory_regiuni = load_population_cube(
+    versions, 'regiuni', ['Localitate', 'Relația cu piața forței de muncă', 'Nivel de instruire', 'Gen', 'Grupe de vârstă'])
 st.write(data_regiuni)
+show_memory_report(memory_regiuni)
 
 # Графики для таблицы 3
 with st.expander("Distribuția populației pe regiuni"):
     st.markdown("<h3 style='color: #32CD32;'>Distribuția populației pe regiuni</h3>",
                 unsafe_allow_html=True)
-    grouped_data = data_regiuni.groupby(['Localitate', 'Gen'])['Valoare'].sum().reset_index()
+    grouped_data = cube_slice(cube_regiuni, 'Localitate', 'Gen')
     fig, ax = plt.subplots(figsize=(12, 6))
     sns.barplot(data=grouped_data, x='Localitate', y='Valoare', hue='Gen', ax=ax, palette='dark', ci=None)
     ax.set_ylabel("Populație")
@@ -126,9 +280,10 @@ with st.expander("Distribuția populației pe regiuni"):
 with st.expander("Distribuția populației în funcție de nivelul de instruire"):
     st.markdown("<h3 style='color: #32CD32;'>Distribuția populației în funcție de nivelul de instruire</h3>",
                 unsafe_allow_html=True)
-    grouped_by_instruire = data_regiuni.groupby(['Localitate', 'Nivel de instruire'])['Valoare'].sum().reset_index()
-    top5_regions = grouped_by_instruire.groupby('Localitate')['Valoare'].sum().nlargest(5).reset_index()
-    top5_data = grouped_by_instruire[grouped_by_instruire['Localitate'].isin(top5_regions['Localitate'])]
+    grouped_by_instruire = cube_slice(cube_regiuni, 'Localitate', 'Nivel de instruire')
+    top5_regions = cube_slice(cube_regiuni, 'Localitate').nlargest(5, 'Valoare')
+    top5_data = grouped_by_instruire[grouped_by_instruire['Localitate'].isin(top5_regions['Localitate'])].copy()
+    top5_data['Localitate'] = top5_data['Localitate'].cat.remove_unused_categories()
     fig, ax = plt.subplots(figsize=(12, 6))
     sns.barplot(data=top5_data, x='Localitate', y='Valoare', hue='Nivel de instruire', ax=ax, palette='dark', ci=None)
     ax.set_ylabel("Populație")
@@ -137,40 +292,27 @@ with st.expander("Distribuția populației în funcție de nivelul de instruire"
     plt.tight_layout()
     st.pyplot(fig)
 
-# Загрузка координат из файла JSON
-with open('coordinates.json', 'r') as file:
-    coordinates_data = json.load(file)
-
-# Преобразование JSON в DataFrame
-coordinates_df = pd.DataFrame(coordinates_data)
-
-# Сопоставление координат с районами
-def get_coordinates(localitate):
-    match = coordinates_df[coordinates_df['city'] == localitate]
-    if not match.empty:
-        return Point(match.iloc[0]['longitude'], match.iloc[0]['latitude'])
-    else:
-        return None  # Возврат None, если координаты не найдены
-
-# Определение топ-3 кандидатов по сумме голосов
-candidate_votes = data_grouped.drop(columns=['Numărul de alegători care au participat la votare',
-                                             'Total voturi valabil exprimate']).iloc[:, 1:]
-top_3_candidates = candidate_votes.sum().nlargest(3).index
+# Координаты из JSON (загружены вместе с остальными таблицами)
+coordinates_df = inputs['coordinates']
 
-# Фильтрация данных только для топ-3 кандидатов
-data_top3 = data_grouped[['Localitate'] + list(top_3_candidates)]
+# Индекс координат по нормализованным названиям (регистр, диакритика, префиксы)
+coordinate_index = build_coordinate_index(coordinates_df)
 
-# Определение победителя среди топ-3 кандидатов в каждом районе
-data_top3['Candidat câștigător'] = data_top3.iloc[:, 1:].idxmax(axis=1)
+# Топ-3 кандидатов и победитель среди них в каждом населённом пункте уже посчитаны в кубе
+top_3_candidates = election_cube['top_candidates']
+data_top3 = data_grouped[['Circumscripție', 'Localitate'] + top_3_candidates + ['Câștigător top-3']]
+data_top3 = data_top3.rename(columns={'Câștigător top-3': 'Candidat câștigător'})
 
-# Добавление геометрии на основе координат
-data_top3['geometry'] = data_top3['Localitate'].apply(get_coordinates)
+# Сопоставление координат векторизованным объединением по индексу
+coordinate_matches = match_coordinates(data_top3['Localitate'], coordinate_index)
+data_top3 = data_top3.merge(coordinate_matches[['Localitate', 'longitude', 'latitude']], on='Localitate', how='left')
 
 # Удаление записей с отсутствующими координатами
-data_top3 = data_top3.dropna(subset=['geometry'])
+data_top3 = data_top3.dropna(subset=['longitude', 'latitude'])
 
-# Преобразование в GeoDataFrame
-gdf = gpd.GeoDataFrame(data_top3, geometry='geometry')
+# Преобразование в GeoDataFrame (точки строятся векторно и проецируются так же, как полигоны)
+gdf = gpd.GeoDataFrame(data_top3, geometry=project_points(data_top3['longitude'], data_top3['latitude']).values)
+data_top3 = data_top3.drop(columns=['longitude', 'latitude'])
 
 # Создание цветовой схемы для топ-3 кандидатов
 candidate_colors = {
@@ -184,10 +326,55 @@ gdf['color'] = gdf['Candidat câștigător'].map(candidate_colors)
 st.markdown("<h1 style='text-align: center; color: #1E90FF;'>Distribuția voturilor pe hartă pentru top-3 candidați</h1>", unsafe_allow_html=True)
 st.divider()
 st.write(data_top3)
+
+with st.expander("Potriviri aproximative și localități fără coordonate"):
+    near_matches = coordinate_matches[coordinate_matches['Potrivire'] != 'exact']
+    if near_matches.empty:
+        st.write("Toate localitățile au fost găsite exact.")
+    else:
+        st.dataframe(near_matches)
+
 fig, ax = plt.subplots(1, 1, figsize=(10, 5))
 
-# Отображение точек с цветовой кодировкой
-gdf.plot(ax=ax, color=gdf['color'], edgecolor='black')
+if os.path.exists(file_path_boundaries):
+    # Картограмма: полигоны из локального файла границ, окрашенные по победителю
+    map_engine = load_boundaries_engine(file_version(file_path_boundaries))
+    map_level = st.radio("Poligoane pe nivel", ['Localitate', 'Circumscripție'], horizontal=True)
+    level_table = election_cube[map_level]['table'].reset_index()
+    raions = level_table['Circumscripție'].str.extract(r'(?:raională|municipală|UTA)\s+(.+?)(?:,\s*nr\.|$)')[0]
+    if map_level == 'Localitate':
+        level_names, level_groups = level_table['Localitate'], raions
+    else:
+        level_names, level_groups = raions, None
+    positions, ambiguous_names = match_polygons(map_engine, level_names, level_groups)
+    if ambiguous_names:
+        st.warning(f"Denumiri ambigue, poligoanele lor nu sunt colorate ({len(ambiguous_names)}): "
+                   f"{', '.join(ambiguous_names[:20])}{' ...' if len(ambiguous_names) > 20 else ''}")
+    winners = level_table['Câștigător top-3'].to_numpy()[np.maximum(positions, 0)]
+    polygon_colors = pd.Series(np.where(positions >= 0, winners, None)).map(candidate_colors)
+
+    zoom = st.slider("Zoom", 1.0, 16.0, 1.0)
+    center_name = st.selectbox("Centrare pe", ['Toată țara'] + list(map_engine['names']))
+    center = None
+    if center_name != 'Toată țara':
+        centroid = map_engine['levels'][0][map_engine['names'].tolist().index(center_name)].centroid
+        center = (centroid.x, centroid.y)
+    viewport = make_viewport(map_engine, zoom, center)
+    render_info = render_choropleth(map_engine, polygon_colors, ax, viewport)
+    st.caption(f"Poligoane afișate: {render_info['visible']}, toleranța simplificării: {render_info['tolerance']} m")
+
+    # Identificarea poligonului într-un punct (în locul tooltip-ului la hover)
+    with st.expander("Identificare după coordonate"):
+        longitude = st.number_input("Longitudine", value=28.86)
+        latitude = st.number_input("Latitudine", value=47.01)
+        point = project_points([longitude], [latitude], map_engine['crs']).iloc[0]
+        for polygon in query_point(map_engine, point.x, point.y):
+            st.write(f"**{map_engine['names'].iloc[polygon]}**")
+            if positions[polygon] >= 0:
+                st.dataframe(level_table.iloc[[positions[polygon]]][top_3_candidates + ['Câștigător top-3']], hide_index=True)
+else:
+    # Отображение точек с цветовой кодировкой
+    gdf.plot(ax=ax, color=gdf['color'], edgecolor='black')
 
 # Добавление легенды
 patches = [
@@ -0,0 +1,130 @@
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+import shapely
+from shapely.geometry import box
+
+from CoordinateIndex import normalize_names
+
+# Допуски упрощения в метрах проекции: 0 — исходная геометрия
+SIMPLIFY_TOLERANCES = [0, 50, 250, 1000, 4000]
+MAP_CRS = 'EPSG:3857'
+
+
+def simplify_levels(geometries, tolerances=SIMPLIFY_TOLERANCES):
+    """
+    Строит уровни упрощения, сохраняющие топологию. coverage_simplify упрощает общие границы
+    соседних полигонов одинаково, поэтому между районами не появляются щели и наложения.
+    """
+    levels = {}
+    for tolerance in tolerances:
+        if tolerance == 0:
+            levels[tolerance] = geometries
+        elif hasattr(shapely, 'coverage_simplify'):
+            levels[tolerance] = shapely.coverage_simplify(geometries, tolerance)
+        else:
+            levels[tolerance] = shapely.simplify(geometries, tolerance, preserve_topology=True)
+    return levels
+
+
+def build_map_engine(boundaries, name_column, crs=MAP_CRS, tolerances=SIMPLIFY_TOLERANCES, group_column=None):
+    """
+    Готовит полигоны к отрисовке: одна проекция, уровни упрощения и пространственный индекс STRtree.
+    Возвращает словарь с таблицей имён, уровнями геометрий, индексом и границами карты.
+    group_column — колонка района полигона: одноимённые коммуны разных районов различаются по ней.
+    """
+    columns = [name_column] + ([group_column] if group_column else [])
+    projected = boundaries[columns + ['geometry']].to_crs(crs).reset_index(drop=True)
+    geometries = shapely.make_valid(np.asarray(projected.geometry.values))
+    return {
+        'names': projected[name_column],
+        'groups': projected[group_column] if group_column else None,
+        'crs': crs,
+        'levels': simplify_levels(geometries, tolerances),
+        'tree': shapely.STRtree(geometries),
+        'bounds': tuple(shapely.total_bounds(geometries)),
+    }
+
+
+def load_map_engine(path, name_column, crs=MAP_CRS, group_column=None):
+    """Читает локальный файл границ (GeoJSON, Shapefile, GeoPackage) и строит движок карты."""
+    return build_map_engine(gpd.read_file(path), name_column, crs, group_column=group_column)
+
+
+def project_points(longitudes, latitudes, crs=MAP_CRS):
+    """Векторно строит точки из долготы и широты и переводит их в проекцию карты."""
+    points = gpd.GeoSeries(gpd.points_from_xy(longitudes, latitudes), crs='EPSG:4326')
+    return points.to_crs(crs)
+
+
+def make_viewport(engine, zoom=1.0, center=None):
+    """Окно просмотра (minx, miny, maxx, maxy) вокруг центра с учётом масштаба."""
+    minx, miny, maxx, maxy = engine['bounds']
+    if center is None:
+        center = ((minx + maxx) / 2, (miny + maxy) / 2)
+    half_width = (maxx - minx) / 2 / zoom
+    half_height = (maxy - miny) / 2 / zoom
+    return center[0] - half_width, center[1] - half_height, center[0] + half_width, center[1] + half_height
+
+
+def pick_tolerance(engine, viewport, width_pixels=1000):
+    """Выбирает самый грубый уровень упрощения, ошибка которого меньше размера пикселя."""
+    pixel_size = (viewport[2] - viewport[0]) / width_pixels
+    suitable = [tolerance for tolerance in engine['levels'] if tolerance <= pixel_size]
+    return max(suitable) if suitable else min(engine['levels'])
+
+
+def query_viewport(engine, viewport):
+    """Номера полигонов, пересекающих окно просмотра."""
+    return np.sort(engine['tree'].query(box(*viewport), predicate='intersects'))
+
+
+def query_point(engine, x, y):
+    """Номера полигонов, содержащих точку (для подсказки при наведении)."""
+    return engine['tree'].query(shapely.Point(x, y), predicate='intersects')
+
+
+def render_choropleth(engine, colors, ax, viewport=None, edgecolor='black'):
+    """
+    Рисует видимые полигоны уровня упрощения, подходящего к окну просмотра.
+    colors — цвета по номерам полигонов, полигоны без данных закрашиваются серым.
+    """
+    viewport = viewport or engine['bounds']
+    visible = query_viewport(engine, viewport)
+    tolerance = pick_tolerance(engine, viewport)
+    geometries = gpd.GeoSeries(engine['levels'][tolerance][visible], crs=engine['crs'])
+    face_colors = pd.Series(colors, dtype=object).fillna('lightgrey').to_numpy()[visible]
+    geometries.plot(ax=ax, color=list(face_colors), edgecolor=edgecolor, linewidth=0.3)
+    ax.set_xlim(viewport[0], viewport[2])
+    ax.set_ylim(viewport[1], viewport[3])
+    ax.set_axis_off()
+    return {'visible': len(visible), 'tolerance': tolerance}
+
+
+def match_keys(names, groups=None):
+    """Ключ сопоставления: нормализованное название без префикса, с районом — 'район|название'."""
+    keys = normalize_names(names)['base'].reset_index(drop=True)
+    if groups is None:
+        return keys
+    return normalize_names(groups)['base'].reset_index(drop=True) + '|' + keys
+
+
+def match_polygons(engine, names, groups=None):
+    """
+    Сопоставляет полигоны с названиями по нормализованному названию без префикса, а если у движка
+    и у названий заданы районы (groups) — по паре (район, название). Ключ, который повторяется
+    среди полигонов или среди названий, не сопоставляется: одноимённые коммуны иначе получили бы чужие данные.
+    Возвращает позиции в names для каждого полигона (-1 — нет совпадения) и список неоднозначных названий.
+    """
+    use_groups = groups is not None and engine.get('groups') is not None
+    polygon_keys = match_keys(engine['names'], engine['groups'] if use_groups else None)
+    name_keys = match_keys(names, groups if use_groups else None)
+    repeated = set(polygon_keys[polygon_keys.duplicated()]) | set(name_keys[name_keys.duplicated()])
+    ambiguous = repeated & set(polygon_keys) & set(name_keys)
+
+    unique_names = ~name_keys.isin(ambiguous)
+    positions = pd.Series(name_keys.index[unique_names], index=name_keys[unique_names].values)
+    positions = positions[~positions.index.duplicated()]
+    matched = polygon_keys.map(positions).where(~polygon_keys.isin(ambiguous))
+    ambiguous_names = sorted(pd.Series(names).reset_index(drop=True)[name_keys.isin(ambiguous)].dropna().unique())
+    return matched.fillna(-1).astype(int).to_numpy(), ambiguous_names
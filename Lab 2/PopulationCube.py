@@ -0,0 +1,52 @@
+from itertools import combinations
+
+import pandas as pd
+
+
+def to_categorical(df, dimensions, orders=None):
+    """
+    Превращает повторяющиеся строковые колонки в упорядоченные категории.
+    Порядок берётся из orders (например, age_order), остальные значения — в порядке появления.
+    """
+    orders = orders or {}
+    df = df.copy()
+    for column in dimensions:
+        values = df[column].dropna().unique().tolist()
+        order = list(orders.get(column, []))
+        categories = order + [value for value in values if value not in order]
+        df[column] = pd.Categorical(df[column], categories=categories, ordered=True)
+    return df
+
+
+def build_population_table(df, dimensions, orders=None, value='Valoare'):
+    """Возвращает таблицу с категориальными измерениями под MultiIndex и отчёт о памяти (байты до и после)."""
+    memory_before = df.memory_usage(deep=True).sum()
+    table = to_categorical(df, dimensions, orders).set_index(dimensions)[[value]]
+    memory_after = table.memory_usage(deep=True, index=True).sum()
+    return table, {'before': int(memory_before), 'after': int(memory_after)}
+
+
+def build_cube(table, value='Valoare'):
+    """
+    Строит куб сумм для всех сочетаний измерений MultiIndex.
+    Сначала агрегируется самый детальный уровень, остальные сочетания сворачиваются из него.
+    Ключ куба — кортеж измерений в порядке уровней индекса, () — общий итог.
+    """
+    dimensions = list(table.index.names)
+    finest = table[value].groupby(level=dimensions, observed=True).sum()
+    cube = {tuple(dimensions): finest, (): finest.sum()}
+    for size in range(1, len(dimensions)):
+        for dims in combinations(dimensions, size):
+            cube[dims] = finest.groupby(level=list(dims), observed=True).sum()
+    return cube
+
+
+def cube_slice(cube, *dims):
+    """Возвращает агрегат куба по измерениям dims (в любом порядке) как DataFrame с колонками измерений."""
+    for key in cube:
+        if len(key) == len(dims) and set(key) == set(dims):
+            result = cube[key].reset_index()
+            for dim in dims:
+                result[dim] = result[dim].cat.remove_unused_categories()
+            return result[list(dims) + [result.columns[-1]]]
+    raise KeyError(f"Куб не содержит сочетание измерений {dims}")
@@ -0,0 +1,69 @@
+import glob
+import hashlib
+import inspect
+import os
+
+import pandas as pd
+
+SNAPSHOT_DIR = '.snapshots'
+
+
+def file_fingerprint(path, chunk_size=1 << 20):
+    """Хеш содержимого файла (SHA-1, первые 16 символов)."""
+    digest = hashlib.sha1()
+    with open(path, 'rb') as file:
+        for chunk in iter(lambda: file.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()[:16]
+
+
+def build_fingerprint(build, depends=()):
+    """
+    Хеш исходного кода функции чтения и всего, от чего зависит результат: вызываемых ею функций
+    и модулей (по исходному коду) и словарей колонок (по repr). Снимок устаревает при изменении любого из них.
+    """
+    digest = hashlib.sha1()
+    for part in (build, *depends):
+        try:
+            source = inspect.getsource(part)
+        except (OSError, TypeError):
+            source = getattr(part, '__qualname__', repr(part))
+        digest.update(source.encode('utf-8'))
+    return digest.hexdigest()[:8]
+
+
+def file_version(path):
+    """Быстрый ключ версии файла по времени изменения и размеру (для кэша Streamlit)."""
+    stat = os.stat(path)
+    return f"{stat.st_mtime_ns}-{stat.st_size}"
+
+
+def load_snapshot(source_path, build, name, depends=(), snapshot_dir=SNAPSHOT_DIR):
+    """
+    Загружает таблицу из снимка Parquet, созданного по хешу содержимого исходного файла, функции build
+    и её зависимостей depends (см. build_fingerprint).
+    Если снимка нет, строит таблицу функцией build(source_path), сохраняет снимок
+    и удаляет устаревшие снимки с тем же именем.
+    """
+    fingerprint = f"{file_fingerprint(source_path)}-{build_fingerprint(build, depends)}"
+    snapshot_path = os.path.join(snapshot_dir, f"{name}-{fingerprint}.parquet")
+    if os.path.exists(snapshot_path):
+        return pd.read_parquet(snapshot_path)
+
+    df = build(source_path)
+    temp_path = f"{snapshot_path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(snapshot_dir, exist_ok=True)
+        df.to_parquet(temp_path, index=False)
+        os.replace(temp_path, snapshot_path)
+    except (ImportError, OSError, TypeError, ValueError) as e:
+        # Без pyarrow или при ошибке записи работаем без снимка
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        print(f"Снимок {snapshot_path} не сохранён: {e}")
+        return df
+
+    for stale_path in glob.glob(os.path.join(snapshot_dir, f"{name}-*.parquet")):
+        if stale_path != snapshot_path:
+            os.remove(stale_path)
+    return df
@@ -1,6 +1,18 @@
+import os
+
+import numpy as np
 import pandas as pd
 import streamlit as st
 
+from Deduplication import SeenHashes, deduplicate_chunk
+from FileVersions import file_version
+from NearDuplicates import find_near_duplicates
+from WineSchema import csv_to_parquet, load_report
+
+CHUNK_SIZE = 50000          # Строк в одном блоке при потоковом чтении
+SKETCH_CAPACITY = 10000     # Счётчиков для частых значений и размер выборки для медианы
+MAX_EXACT_VALUES = 200000   # До этого числа различных значений медиана считается точно
+
 def clean_data(df):
     """Функция для очистки данных: обработка пропусков, преобразование типов и удаление дубликатов."""
     
@@ -44,35 +56,293 @@ def clean_data(df):
     return df
 
 
+def update_heavy_hitters(counters, counts, capacity=SKETCH_CAPACITY):
+    """
+    Слияние сводки Мисры–Гриса с частотами очередного блока.
+    Хранится не больше capacity счётчиков; любое значение с частотой выше N/capacity гарантированно остаётся.
+    """
+    merged = counters.add(counts, fill_value=0)
+    if len(merged) > capacity:
+        threshold = merged.nlargest(capacity + 1).iloc[-1]
+        merged = merged[merged > threshold] - threshold
+    return merged
+
+
+def update_median_state(state, values, capacity=SKETCH_CAPACITY, max_exact=MAX_EXACT_VALUES, rng=None):
+    """
+    Обновляет состояние медианы колонки: точные частоты значений, пока различных значений
+    не больше max_exact, затем — равномерная выборка фиксированного размера (bottom-k по случайным ключам).
+    """
+    rng = rng or np.random.default_rng()
+    if state.get('counts') is not None:
+        state['counts'] = state['counts'].add(values.value_counts(), fill_value=0)
+        if len(state['counts']) > max_exact:
+            state['sample'] = sample_from_counts(state['counts'], capacity, rng)
+            state['counts'] = None
+        return state
+    keys = pd.Series(rng.random(len(values)), index=values.to_numpy())
+    combined = pd.concat([state['sample'], keys]) if len(state['sample']) else keys
+    state['sample'] = combined.nsmallest(capacity)
+    return state
+
+
+def sample_from_counts(counts, capacity, rng):
+    """
+    Выборка bottom-k из накопленных частот без разворачивания их в строки: сколько раз каждое
+    значение попадёт в выборку без возвращения — многомерное гипергеометрическое распределение,
+    а ключи k наименьших из N равномерных чисел — равномерные на [0, T], где T ~ Beta(k + 1, N - k).
+    """
+    frequencies = counts.to_numpy().astype(np.int64)
+    total = int(frequencies.sum())
+    size = min(capacity, total)
+    taken = rng.multivariate_hypergeometric(frequencies, size)
+    threshold = rng.beta(size + 1, total - size) if total > size else 1.0
+    return pd.Series(rng.uniform(0, threshold, size), index=np.repeat(counts.index.to_numpy(), taken))
+
+
+def median_from_state(state):
+    """Медиана по точным частотам (как Series.median) или по выборке."""
+    if state.get('counts') is None:
+        return float(np.median(state['sample'].index.to_numpy())) if len(state['sample']) else np.nan
+    counts = state['counts'].sort_index()
+    if counts.empty:
+        return np.nan
+    cumulative = counts.cumsum().to_numpy()
+    total = cumulative[-1]
+    lower = counts.index[np.searchsorted(cumulative, (total + 1) // 2)]
+    upper = counts.index[np.searchsorted(cumulative, total // 2 + 1)]
+    return (lower + upper) / 2
+
+
+def collect_statistics(file_path, chunksize=CHUNK_SIZE, capacity=SKETCH_CAPACITY, seed=42):
+    """
+    Первый проход потоковой очистки: пропуски, некорректные 'points', тип каждой колонки
+    (и есть ли в числовой дробные значения), частые значения (мода) и медианы. Память зависит от размера блока и capacity, а не от размера файла.
+    """
+    rng = np.random.default_rng(seed)
+    rows = 0
+    missing = non_numeric = fractional = None
+    heavy_hitters, medians = {}, {}
+    for chunk in pd.read_csv(file_path, chunksize=chunksize, dtype=str):
+        if missing is None:
+            missing = pd.Series(0, index=chunk.columns)
+            non_numeric = pd.Series(0, index=chunk.columns)
+            fractional = pd.Series(False, index=chunk.columns)
+            heavy_hitters = {column: pd.Series(dtype='float64') for column in chunk.columns}
+            medians = {column: {'counts': pd.Series(dtype='float64')} for column in chunk.columns}
+        rows += len(chunk)
+        for column in chunk.columns:
+            raw = chunk[column]
+            numeric = pd.to_numeric(raw, errors='coerce')
+            non_numeric[column] += (numeric.isna() & raw.notna()).sum()
+            fractional[column] |= bool((numeric.dropna() % 1 != 0).any())
+            missing[column] += (numeric if column == 'points' else raw).isna().sum()
+            heavy_hitters[column] = update_heavy_hitters(heavy_hitters[column], raw.value_counts(), capacity)
+            medians[column] = update_median_state(medians[column], numeric.dropna(), capacity, rng=rng)
+
+    if missing is None:
+        return {'rows': 0, 'columns': [], 'numeric_columns': [], 'integer_columns': [],
+                'missing': pd.Series(dtype='int64'), 'invalid_points': 0, 'fill_values': {}}
+
+    # Колонка числовая, если все непустые значения — числа (как при выводе типов в pd.read_csv)
+    numeric_columns = [column for column in missing.index if non_numeric[column] == 0 or column == 'points']
+    fill_values = {}
+    for column in missing.index:
+        if column in numeric_columns:
+            fill_values[column] = median_from_state(medians[column])
+        elif not heavy_hitters[column].empty:
+            fill_values[column] = heavy_hitters[column].idxmax()
+    # Целая колонка остаётся целой и после заполнения, если её медиана — тоже целое число
+    integer_columns = [column for column in numeric_columns if not fractional[column]
+                       and (pd.isna(fill_values[column]) or float(fill_values[column]).is_integer())]
+    return {
+        'rows': rows,
+        'columns': list(missing.index),
+        'numeric_columns': numeric_columns,
+        'integer_columns': integer_columns,
+        'missing': missing,
+        'invalid_points': int(non_numeric.get('points', 0)),
+        'fill_values': fill_values,
+    }
+
+
+def clean_csv_chunked(input_file, output_file, statistics, chunksize=CHUNK_SIZE, key_columns=None, spill_dir=None):
+    """
+    Второй проход: приведение типов, заполнение пропусков по статистикам первого прохода,
+    удаление дубликатов и запись очищенных блоков на диск. Возвращает отчёт о результате.
+    key_columns — удалять дубликаты по подмножеству колонок (например, ['title', 'winery']).
+    """
+    fill_values = {column: value for column, value in statistics['fill_values'].items() if pd.notna(value)}
+    duplicates = collisions = 0
+    rows_written = 0
+    missing_after = pd.Series(0, index=statistics['columns'])
+    temp_file = f"{output_file}.tmp"
+    first = True
+    # Сброшенные на диск хеши удаляются и при ошибке посреди файла
+    with SeenHashes(spill_dir=spill_dir) as seen:
+        for chunk in pd.read_csv(input_file, chunksize=chunksize, dtype=str):
+            # Один тип на весь файл: иначе блок без пропусков получил бы int64, а блок с пропуском — float64,
+            # и одинаковые строки из разных блоков записывались бы и хешировались по-разному.
+            # Целые колонки по первому проходу записываются как Int64 (85, а не 85.0)
+            for column in statistics['numeric_columns']:
+                chunk[column] = pd.to_numeric(chunk[column], errors='coerce').astype('float64')
+            chunk = chunk.fillna(fill_values)
+            for column in statistics['integer_columns']:
+                chunk[column] = chunk[column].astype('Int64')
+
+            # Дубликаты внутри блока и с уже записанными строками (по хешам строк)
+            chunk, chunk_duplicates, chunk_collisions = deduplicate_chunk(chunk, seen, key_columns)
+            duplicates += chunk_duplicates
+            collisions += chunk_collisions
+
+            missing_after += chunk.isnull().sum()
+            rows_written += len(chunk)
+            chunk.to_csv(temp_file, mode='w' if first else 'a', header=first, index=False)
+            first = False
+        spilled_runs = len(seen.runs)
+    if first:
+        pd.DataFrame(columns=statistics['columns']).to_csv(temp_file, index=False)
+    os.replace(temp_file, output_file)
+    return {'duplicates': duplicates, 'collisions': collisions, 'spilled_runs': spilled_runs,
+            'rows_written': rows_written, 'missing_after': missing_after}
+
+
+def report_cleaning(statistics, report):
+    """Вывод результатов потоковой очистки в том же виде, что и clean_data."""
+    st.write("### Преобразование типов данных:")
+    if 'points' in statistics['columns']:
+        st.write("Колонка 'points' успешно преобразована в числовой тип.")
+        if statistics['invalid_points'] > 0:
+            st.warning(f"Обнаружено {statistics['invalid_points']} некорректных значений в 'points', они заменены на NaN.")
+
+    st.write("### Обработка пропущенных значений:")
+    st.write("Количество пропущенных значений до обработки:")
+    st.write(statistics['missing'])
+
+    st.write("\n### Проверка и удаление дубликатов:")
+    st.write(f"Количество дубликатов до удаления: {report['duplicates']}")
+    st.write("Количество дубликатов после удаления: 0")
+    if report['collisions'] > 0:
+        st.write(f"Совпадений хеша без совпадения строк (строки сохранены): {report['collisions']}")
+
+    st.write("\n### Количество пропущенных значений после обработки:")
+    st.write(report['missing_after'])
+
+
+def near_duplicate_report(file_path, threshold, chunksize=CHUNK_SIZE):
+    """
+    Почти-дубликаты описаний в очищенном файле (MinHash + LSH): читается только колонка description.
+    Возвращает кластеры с описаниями и номера строк для удаления (все, кроме первой в кластере).
+    """
+    descriptions = pd.concat(pd.read_csv(file_path, usecols=['description'], dtype=str, chunksize=chunksize),
+                             ignore_index=True)['description']
+    clusters = find_near_duplicates(descriptions, threshold)
+    clusters['description'] = descriptions.to_numpy()[clusters['Строка'].to_numpy()]
+    redundant = clusters.loc[clusters.duplicated('Кластер'), 'Строка'].to_numpy()
+    return clusters, redundant
+
+
+def drop_rows_csv(file_path, rows, output_file, chunksize=CHUNK_SIZE):
+    """Потоково записывает в output_file копию файла без строк с указанными номерами (нумерация с 0, без заголовка)."""
+    rows = np.sort(np.asarray(rows))
+    temp_file = f"{output_file}.tmp"
+    offset = 0
+    first = True
+    for chunk in pd.read_csv(file_path, chunksize=chunksize, dtype=str):
+        positions = np.arange(offset, offset + len(chunk))
+        offset += len(chunk)
+        chunk[~np.isin(positions, rows)].to_csv(temp_file, mode='w' if first else 'a', header=first, index=False)
+        first = False
+    if first:
+        pd.read_csv(file_path, nrows=0).to_csv(temp_file, index=False)
+    os.replace(temp_file, output_file)
+    return offset - len(rows)
+
+
+@st.cache_data
+def clean_file(file_path, output_path, parquet_path, version):
+    """
+    Оба потоковых прохода очистки и колоночная копия — один раз на версию исходного файла,
+    а не при каждом изменении виджета на странице.
+    """
+    statistics = collect_statistics(file_path)
+    report = clean_csv_chunked(file_path, output_path, statistics)
+    csv_to_parquet(output_path, parquet_path)
+    return statistics, report
+
+
+@st.cache_data(max_entries=16)
+def load_near_duplicates(output_path, version, threshold):
+    """Почти-дубликаты очищенного файла для версии исходного файла и порога (MinHash — один раз на пару)."""
+    return near_duplicate_report(output_path, threshold)
+
+
+# Одна запись: файл на диске всегда соответствует последнему вызову, и попадание в кэш его не подменяет
+@st.cache_data(max_entries=1)
+def drop_near_duplicates(output_path, deduplicated_path, version, threshold):
+    """Копия очищенного файла без почти-дубликатов для версии исходного файла и порога; сам очищенный файл не меняется."""
+    _, redundant = load_near_duplicates(output_path, version, threshold)
+    return drop_rows_csv(output_path, redundant, deduplicated_path)
+
+
 def main():
     st.title("Анализ данных о винах")
-    
+
     # Путь к файлу
     file_path = "./dirty_wine_data.csv"
-    
-    if file_path is not None:
-        # Чтение данных из CSV
-        df = pd.read_csv(file_path)
+    output_path = "./cleaned_wine_data.csv"
+    parquet_path = "./cleaned_wine_data.parquet"  # Колоночная копия очищенных данных
+    deduplicated_path = "./deduplicated_wine_data.csv"  # Очищенные данные без почти-дубликатов
 
-        # Отображение исходных данных
+    if file_path is not None:
+        # Отображение начала исходных данных (весь файл в память не загружается)
         st.subheader("Исходные данные:")
-        st.dataframe(df)
+        st.dataframe(pd.read_csv(file_path, nrows=1000))
 
-        # Очистка данных
+        # Очистка данных в два потоковых прохода (повторно — только при изменении исходного файла)
         st.subheader("Очистка данных:")
-        cleaned_df = clean_data(df)
+        version = file_version(file_path)
+        if not (os.path.exists(output_path) and os.path.exists(parquet_path)):
+            clean_file.clear()
+        statistics, report = clean_file(file_path, output_path, parquet_path, version)
+        report_cleaning(statistics, report)
 
-        # Отображение очищенных данных
+        # Отображение начала очищенных данных
         st.subheader("Очищенные данные:")
-        st.dataframe(cleaned_df)
-
-        # Скачать очищенные данные
-        st.download_button(
-            label="Скачать очищенные данные в формате CSV",
-            data=cleaned_df.to_csv(index=False).encode('utf-8'),
-            file_name="cleaned_wine_data.csv",
-            mime="text/csv"
-        )
+        st.write(f"Записано строк: {report['rows_written']} в {output_path}")
+        st.dataframe(pd.read_csv(output_path, nrows=1000))
+
+        # Почти-дубликаты: одни и те же отзывы с правками пробелов и пунктуации
+        download_path = output_path
+        if report['rows_written'] > 0 and 'description' in statistics['columns']:
+            st.subheader("Почти-дубликаты описаний:")
+            threshold = st.slider("Порог сходства Жаккара", 0.5, 1.0, 0.8, 0.05)
+            clusters, redundant = load_near_duplicates(output_path, version, threshold)
+            st.write(f"Кластеров почти-дубликатов: {clusters['Кластер'].nunique()}, "
+                     f"строк в них: {len(clusters)}, лишних строк: {len(redundant)}")
+            if not clusters.empty:
+                st.dataframe(clusters)
+                if st.checkbox("Удалить почти-дубликаты (оставить первую строку каждого кластера)"):
+                    if not os.path.exists(deduplicated_path):
+                        drop_near_duplicates.clear()
+                    rows_left = drop_near_duplicates(output_path, deduplicated_path, version, threshold)
+                    st.write(f"Осталось строк: {rows_left}, записано в {deduplicated_path} ({output_path} не изменён)")
+                    download_path = deduplicated_path
+
+        # Колоночная копия и сравнение памяти и времени загрузки
+        st.write(f"Колоночная копия: {parquet_path} ({os.path.getsize(parquet_path) / 2 ** 20:.2f} МБ, "
+                 f"CSV — {os.path.getsize(output_path) / 2 ** 20:.2f} МБ)")
+        if st.checkbox("Сравнить память и время загрузки"):
+            st.table(load_report(output_path, parquet_path).style.format("{:.2f}"))
+
+        # Скачать очищенные данные прямо из файла на диске
+        with open(download_path, 'rb') as cleaned_file:
+            st.download_button(
+                label="Скачать очищенные данные в формате CSV",
+                data=cleaned_file,
+                file_name=os.path.basename(download_path),
+                mime="text/csv"
+            )
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
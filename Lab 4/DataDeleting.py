@@ -1,28 +1,149 @@
+import numpy as np
 import pandas as pd
 
-def reduce_csv_size(input_file, output_file, reduction_factor=7):
+CHUNK_SIZE = 50000  # Строк в одном блоке при потоковом чтении
+
+
+def write_chunk(chunk, output_file, first):
+    chunk.to_csv(output_file, mode='w' if first else 'a', header=first, index=False)
+
+
+def bernoulli_sample(input_file, output_file, fraction, seed=42, chunksize=CHUNK_SIZE):
+    """
+    Бернуллиевская выборка: каждая строка остаётся независимо с вероятностью fraction.
+    Файл читается блоками, выбранные строки сразу дописываются в output_file.
+
+    Args:
+        input_file (str): Путь к исходному файлу CSV.
+        output_file (str): Путь к файлу с выборкой.
+        fraction (float): Доля строк, которую нужно оставить.
+        seed (int): Зерно генератора для воспроизводимой выборки.
+        chunksize (int): Строк в одном блоке.
+
+    Returns:
+        int: Число строк в выборке.
+    """
+    rng = np.random.default_rng(seed)
+    written = 0
+    first = True
+    for chunk in pd.read_csv(input_file, chunksize=chunksize):
+        sample = chunk[rng.random(len(chunk)) < fraction]
+        write_chunk(sample, output_file, first)
+        first = False
+        written += len(sample)
+    return written
+
+
+def reservoir_sample(input_file, output_file, size, seed=42, chunksize=CHUNK_SIZE):
+    """
+    Резервуарная выборка фиксированного размера: каждой строке присваивается случайный ключ,
+    в памяти держатся только size строк с наименьшими ключами. Строки записываются в исходном порядке.
+
+    Args:
+        input_file (str): Путь к исходному файлу CSV.
+        output_file (str): Путь к файлу с выборкой.
+        size (int): Число строк в выборке.
+        seed (int): Зерно генератора для воспроизводимой выборки.
+        chunksize (int): Строк в одном блоке.
+
+    Returns:
+        int: Число строк в выборке.
+    """
+    rng = np.random.default_rng(seed)
+    reservoir = None
+    offset = 0
+    for chunk in pd.read_csv(input_file, chunksize=chunksize):
+        chunk.index = pd.RangeIndex(offset, offset + len(chunk))
+        offset += len(chunk)
+        chunk['_key'] = rng.random(len(chunk))
+        combined = chunk if reservoir is None else pd.concat([reservoir, chunk])
+        reservoir = combined.nsmallest(size, '_key')
+    if reservoir is None:
+        return 0
+    reservoir.sort_index().drop(columns='_key').to_csv(output_file, index=False)
+    return len(reservoir)
+
+
+def stratified_sample(input_file, output_file, column, fraction, min_per_stratum=1, seed=42, chunksize=CHUNK_SIZE):
+    """
+    Стратифицированная выборка по колонке (например, 'country' или 'variety'): в каждой категории
+    остаётся доля fraction строк, но не меньше min_per_stratum, поэтому редкие категории не пропадают.
+    Строка выбирается, если её случайный ключ меньше fraction; для добора редких категорий в памяти
+    хранятся лишь min_per_stratum невыбранных строк с наименьшими ключами на категорию.
+
+    Args:
+        input_file (str): Путь к исходному файлу CSV.
+        output_file (str): Путь к файлу с выборкой.
+        column (str): Колонка, по категориям которой строится выборка (пропуски — отдельная категория).
+        fraction (float): Доля строк, которую нужно оставить в каждой категории.
+        min_per_stratum (int): Минимум строк от каждой категории.
+        seed (int): Зерно генератора для воспроизводимой выборки.
+        chunksize (int): Строк в одном блоке.
+
+    Returns:
+        pd.Series: Число строк выборки по категориям.
+    """
+    rng = np.random.default_rng(seed)
+    selected = pd.Series(dtype='int64')
+    reserve = None
+    first = True
+    for chunk in pd.read_csv(input_file, chunksize=chunksize):
+        keys = rng.random(len(chunk))
+        strata = chunk[column].fillna('<пропуск>')
+        chosen = keys < fraction
+        write_chunk(chunk[chosen], output_file, first)
+        first = False
+        selected = selected.add(strata[chosen].value_counts(), fill_value=0)
+
+        rest = chunk[~chosen].assign(_key=keys[~chosen], _stratum=strata[~chosen])
+        combined = rest if reserve is None else pd.concat([reserve, rest], ignore_index=True)
+        reserve = combined.sort_values('_key').groupby('_stratum', sort=False).head(min_per_stratum)
+
+    if reserve is not None:
+        # Добор категорий, в которые по случайным ключам попало меньше min_per_stratum строк
+        missing = (min_per_stratum - reserve['_stratum'].map(selected).fillna(0)).clip(lower=0)
+        rank = reserve.groupby('_stratum').cumcount()
+        extra = reserve[rank < missing]
+        write_chunk(extra.drop(columns=['_key', '_stratum']), output_file, first)
+        selected = selected.add(extra['_stratum'].value_counts(), fill_value=0)
+    return selected.astype('int64').sort_values(ascending=False)
+
+
+def reduce_csv_size(input_file, output_file, reduction_factor=7, method='bernoulli', stratify_by=None, size=None,
+                    seed=42):
     """
     Уменьшает размер данных в CSV-файле путем случайного удаления строк.
-    
+    Файл читается блоками, поэтому память не зависит от его размера: доля строк отбирается
+    бернуллиевской или стратифицированной выборкой, а резервуар (в памяти size строк) —
+    только для выборки фиксированного размера.
+
     Args:
         input_file (str): Путь к исходному файлу CSV.
         output_file (str): Путь к файлу, где будет сохранён уменьшенный набор данных.
         reduction_factor (int): Во сколько раз уменьшить размер данных (по умолчанию 7).
+        method (str): 'bernoulli', 'reservoir' (ровно size строк) или 'stratified'.
+        stratify_by (str): Колонка для стратифицированной выборки (например, 'country').
+        size (int): Число строк для method='reservoir'; reduction_factor при этом не используется.
+        seed (int): Зерно генератора для воспроизводимой выборки.
     """
-    # Загрузка данных из CSVs
-    df = pd.read_csv(input_file)
-
     # Расчет доли строк, которые нужно оставить
     fraction_to_keep = 1 / reduction_factor
 
-    # Случайная выборка строк
-    reduced_df = df.sample(frac=fraction_to_keep, random_state=42)
-
-    # Сохранение уменьшенного набора данных
-    reduced_df.to_csv(output_file, index=False)
+    # Случайная выборка строк с записью результата блоками
+    if method == 'reservoir':
+        # Размер от числа строк файла (N / reduction_factor) держал бы в памяти долю всего файла
+        if size is None:
+            raise ValueError("Для method='reservoir' нужен размер выборки size; долю строк оставляет method='bernoulli'")
+        reservoir_sample(input_file, output_file, size, seed)
+    elif method == 'stratified':
+        stratified_sample(input_file, output_file, stratify_by, fraction_to_keep, seed=seed)
+    else:
+        bernoulli_sample(input_file, output_file, fraction_to_keep, seed)
     print(f"Уменьшенный файл сохранён в: {output_file}")
 
-# Пример использования
-input_file = "./cleaned_wine_data.csv"
-output_file = "./reduced_cleaned_wine_data.csv"  # Уменьшенный файл
-reduce_csv_size(input_file, output_file)
+
+if __name__ == "__main__":
+    # Пример использования
+    input_file = "./cleaned_wine_data.csv"
+    output_file = "./reduced_cleaned_wine_data.csv"  # Уменьшенный файл
+    reduce_csv_size(input_file, output_file)
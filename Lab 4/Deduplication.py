@@ -0,0 +1,140 @@
+import os
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+# Ключ проверочного хеша. Основной хеш — pandas с ключом по умолчанию; ключ pandas применяет только
+# к строкам, поэтому проверочный хеш считается по строковому представлению всех колонок
+SECONDARY_HASH_KEY = 'wine-dedup-check'
+MAX_KEYS_IN_MEMORY = 2_000_000
+
+
+def row_hashes(df, columns=None):
+    """
+    Векторно считает 128-битный хеш строки как два независимых 64-битных хеша: основной по значениям
+    колонок и проверочный по их строковому представлению с другим ключом (в том числе для чисел).
+    """
+    subset = df if columns is None else df[columns]
+    primary = pd.util.hash_pandas_object(subset, index=False).to_numpy()
+    secondary = pd.util.hash_pandas_object(subset.astype(str), index=False, hash_key=SECONDARY_HASH_KEY).to_numpy()
+    return primary, secondary
+
+
+def sorted_pairs(primary, secondary):
+    order = np.lexsort((secondary, primary))
+    return primary[order], secondary[order]
+
+
+def lookup_sorted(store_primary, store_secondary, primary, secondary):
+    """
+    Поиск пар хешей в отсортированном хранилище бинарным поиском.
+    Возвращает маски: найдена та же пара (дубликат) и совпал только основной хеш (коллизия).
+    """
+    left = np.searchsorted(store_primary, primary, side='left')
+    right = np.searchsorted(store_primary, primary, side='right')
+    has_primary = right > left
+    position = np.minimum(left, max(len(store_primary) - 1, 0))
+    found = has_primary & (np.asarray(store_secondary[position]) == secondary)
+    # Несколько записей с одинаковым основным хешем встречаются крайне редко — проверяем их по одной
+    for i in np.flatnonzero(has_primary & ~found & (right - left > 1)):
+        found[i] = np.any(np.asarray(store_secondary[left[i]:right[i]]) == secondary[i])
+    return found, has_primary & ~found
+
+
+class SeenHashes:
+    """
+    Множество уже встреченных строк в виде отсортированных пар 64-битных хешей.
+    Когда в памяти больше max_keys_in_memory пар, они сбрасываются на диск отсортированным
+    блоком .npy и дальше читаются через memmap. Сброшенные блоки удаляет close()
+    (или выход из with), временную папку — целиком, если её создал сам объект.
+    """
+
+    def __init__(self, max_keys_in_memory=MAX_KEYS_IN_MEMORY, spill_dir=None):
+        self.max_keys_in_memory = max_keys_in_memory
+        self.spill_dir = spill_dir
+        self.created_dir = False
+        self.memory = (np.empty(0, dtype=np.uint64), np.empty(0, dtype=np.uint64))
+        self.runs = []
+        self.run_paths = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self):
+        return len(self.memory[0]) + sum(len(run[0]) for run in self.runs)
+
+    def lookup(self, primary, secondary):
+        found = np.zeros(len(primary), dtype=bool)
+        collisions = np.zeros(len(primary), dtype=bool)
+        for store_primary, store_secondary in [self.memory] + self.runs:
+            if len(store_primary) == 0:
+                continue
+            run_found, run_collisions = lookup_sorted(store_primary, store_secondary, primary, secondary)
+            found |= run_found
+            collisions |= run_collisions
+        return found, collisions & ~found
+
+    def add(self, primary, secondary):
+        self.memory = sorted_pairs(np.concatenate([self.memory[0], primary]),
+                                   np.concatenate([self.memory[1], secondary]))
+        if len(self.memory[0]) > self.max_keys_in_memory:
+            self.spill()
+
+    def spill(self):
+        if self.spill_dir is None:
+            self.spill_dir = tempfile.mkdtemp(prefix='wine-dedup-')
+            self.created_dir = True
+        os.makedirs(self.spill_dir, exist_ok=True)
+        run = []
+        for name, values in zip(['primary', 'secondary'], self.memory):
+            path = os.path.join(self.spill_dir, f"run{len(self.runs)}-{name}.npy")
+            np.save(path, values)
+            self.run_paths.append(path)
+            run.append(np.load(path, mmap_mode='r'))
+        self.runs.append(tuple(run))
+        self.memory = (np.empty(0, dtype=np.uint64), np.empty(0, dtype=np.uint64))
+
+    def close(self):
+        """Удаляет сброшенные на диск блоки; переданную снаружи папку spill_dir оставляет."""
+        self.runs = []
+        for path in self.run_paths:
+            if os.path.exists(path):
+                os.remove(path)
+        self.run_paths = []
+        if self.created_dir:
+            shutil.rmtree(self.spill_dir, ignore_errors=True)
+            self.spill_dir = None
+            self.created_dir = False
+
+
+def deduplicate_chunk(chunk, seen, key_columns=None):
+    """
+    Удаляет из блока строки, уже встреченные в этом или предыдущих блоках.
+    key_columns — режим по подмножеству колонок (например, ['title', 'winery']).
+    Совпадения внутри блока подтверждаются сравнением значений, между блоками — проверочным хешем.
+    Возвращает (очищенный блок, число дубликатов, число коллизий хеша).
+    """
+    subset = chunk if key_columns is None else chunk[key_columns]
+    primary, secondary = row_hashes(subset)
+
+    # Дубликаты внутри блока: кандидаты по хешу, затем точная проверка значений с первой строкой группы
+    hashes = pd.DataFrame({'primary': primary, 'secondary': secondary})
+    candidates = hashes.duplicated().to_numpy()
+    if candidates.any():
+        first_position = pd.Series(np.arange(len(hashes))).groupby(
+            [hashes['primary'], hashes['secondary']]).transform('min').to_numpy()
+        values = subset.to_numpy(dtype=object)
+        rows = np.flatnonzero(candidates)
+        left, right = values[rows], values[first_position[rows]]
+        same = ((left == right) | (pd.isna(left) & pd.isna(right))).all(axis=1)
+        candidates[rows[~same]] = False
+
+    found, collisions = seen.lookup(primary, secondary)
+    keep = ~(candidates | found)
+    seen.add(primary[keep], secondary[keep])
+    return chunk[keep], int((~keep).sum()), int(collisions.sum())
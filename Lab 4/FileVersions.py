@@ -0,0 +1,17 @@
+import hashlib
+import os
+
+
+def file_fingerprint(path, chunk_size=1 << 20):
+    """Хеш содержимого файла (SHA-1, первые 16 символов) — ключ сохранённых на диск индексов."""
+    digest = hashlib.sha1()
+    with open(path, 'rb') as file:
+        for chunk in iter(lambda: file.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()[:16]
+
+
+def file_version(path):
+    """Быстрый ключ версии файла по времени изменения и размеру (для кэшей Streamlit)."""
+    stat = os.stat(path)
+    return f"{stat.st_mtime_ns}-{stat.st_size}"
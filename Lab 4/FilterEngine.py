@@ -0,0 +1,113 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+CATEGORICAL_COLUMNS = ["country", "variety", "category", "region_1"]
+NUMERIC_COLUMNS = ["price", "points", "alcohol", "price_quality_ratio"]
+MAX_CACHED_BITMAPS = 256
+
+
+class FilterEngine:
+    """
+    Индексы для фильтров панели: битовые карты (np.packbits) по каждому значению категориальных колонок
+    и отсортированные индексы числовых колонок для диапазонов. Фильтры объединяются побитовым AND,
+    битовые карты отдельных фильтров и их сочетаний кэшируются, поэтому повторный или сужающийся
+    фильтр пересчитывает только изменившуюся часть.
+    """
+
+    def __init__(self, df, categorical_columns=CATEGORICAL_COLUMNS, numeric_columns=NUMERIC_COLUMNS,
+                 max_cached=MAX_CACHED_BITMAPS):
+        self.rows = len(df)
+        self.max_cached = max_cached
+        self.cache = OrderedDict()
+        # Движок общий для всех сессий (st.cache_resource), а OrderedDict не потокобезопасен
+        self.lock = threading.Lock()
+        self.categories = {}
+        self.codes = {}
+        self.bitmaps = {}
+        for column in categorical_columns:
+            if column not in df.columns:
+                continue
+            codes, uniques = pd.factorize(df[column])
+            positions = np.flatnonzero(codes >= 0)
+            # Биты ставятся сразу в упакованные карты, без промежуточной булевой матрицы значения × строки
+            bitmaps = np.zeros((len(uniques), (self.rows + 7) // 8), dtype=np.uint8)
+            bits = (np.uint8(128) >> (positions % 8).astype(np.uint8)).astype(np.uint8)
+            np.bitwise_or.at(bitmaps, (codes[positions], positions // 8), bits)
+            self.categories[column] = pd.Series(np.arange(len(uniques)), index=uniques)
+            self.codes[column] = codes
+            self.bitmaps[column] = bitmaps
+        self.sorted = {}
+        for column in numeric_columns:
+            if column not in df.columns:
+                continue
+            values = df[column].to_numpy(dtype='float64')
+            order = np.argsort(values, kind='stable')
+            valid = order[~np.isnan(values[order])]
+            self.sorted[column] = (values[valid], valid)
+
+    def all_rows(self):
+        return np.packbits(np.ones(self.rows, dtype=bool))
+
+    def lookup(self, key):
+        """Битовая карта из кэша (с отметкой последнего использования) или None."""
+        with self.lock:
+            bitmap = self.cache.get(key)
+            if bitmap is not None:
+                self.cache.move_to_end(key)
+            return bitmap
+
+    def remember(self, key, bitmap):
+        with self.lock:
+            self.cache[key] = bitmap
+            self.cache.move_to_end(key)
+            while len(self.cache) > self.max_cached:
+                self.cache.popitem(last=False)
+        return bitmap
+
+    def category_bitmap(self, column, values):
+        """Строки, у которых значение колонки входит в values (OR битовых карт значений)."""
+        key = ('in', column, frozenset(values))
+        cached = self.lookup(key)
+        if cached is not None:
+            return cached
+        codes = self.categories[column].reindex(list(values)).dropna().astype(int).to_numpy()
+        bitmaps = self.bitmaps[column][codes]
+        bitmap = np.bitwise_or.reduce(bitmaps, axis=0) if len(codes) else np.zeros(self.bitmaps[column].shape[1], dtype=np.uint8)
+        return self.remember(key, bitmap)
+
+    def range_bitmap(self, column, low=None, high=None):
+        """Строки со значением в [low, high] по отсортированному индексу: два бинарных поиска и срез."""
+        key = ('range', column, low, high)
+        cached = self.lookup(key)
+        if cached is not None:
+            return cached
+        values, order = self.sorted[column]
+        start = 0 if low is None else np.searchsorted(values, low, side='left')
+        end = len(values) if high is None else np.searchsorted(values, high, side='right')
+        mask = np.zeros(self.rows, dtype=bool)
+        mask[order[start:end]] = True
+        return self.remember(key, np.packbits(mask))
+
+    def mask(self, categories=None, ranges=None):
+        """
+        Булева маска строк, прошедших все фильтры. categories — {колонка: выбранные значения}
+        (пустой выбор не фильтрует), ranges — {колонка: (нижняя граница, верхняя граница)}.
+        """
+        parts = [('in', column, frozenset(values)) for column, values in (categories or {}).items() if len(values)]
+        parts += [('range', column, low, high) for column, (low, high) in (ranges or {}).items()]
+        key = ('and', frozenset(parts))
+        bitmap = self.lookup(key)
+        if bitmap is None:
+            bitmap = self.all_rows()
+            for part in parts:
+                part_bitmap = self.category_bitmap(part[1], part[2]) if part[0] == 'in' else self.range_bitmap(*part[1:])
+                bitmap = np.bitwise_and(bitmap, part_bitmap)
+            self.remember(key, bitmap)
+        return np.unpackbits(bitmap, count=self.rows).astype(bool)
+
+    def select(self, categories=None, ranges=None):
+        """Номера строк, прошедших все фильтры, по возрастанию."""
+        return np.flatnonzero(self.mask(categories, ranges))
@@ -0,0 +1,142 @@
+import numpy as np
+import pandas as pd
+
+GROUP_COLUMNS = ["country", "variety"]
+NUMERIC_COLUMNS = ["price", "points", "alcohol"]
+SKETCH_BINS = 256  # Корзин гистограммы для квантилей
+
+
+def sketch_edges(values, bins=SKETCH_BINS):
+    """
+    Общие для всех групп границы гистограммы колонки. Если различных значений не больше bins,
+    каждое значение — своя корзина и квантили точные; иначе границы — глобальные квантили.
+    """
+    unique = np.unique(values)
+    if len(unique) <= bins:
+        return unique, True
+    return np.unique(np.quantile(values, np.linspace(0, 1, bins + 1))), False
+
+
+def build_group_statistics(df, group_columns=GROUP_COLUMNS, numeric_columns=NUMERIC_COLUMNS, bins=SKETCH_BINS):
+    """
+    Частичные статистики по группам (например, страна × сорт) для каждой числовой колонки:
+    количество, сумма, сумма квадратов, минимум, максимум и гистограмма на общих границах.
+    Все они складываются, поэтому статистики любого набора групп собираются за O(число групп).
+    """
+    group_columns = [column for column in group_columns if column in df.columns]
+    grouped = df.groupby(group_columns, dropna=False, sort=False, observed=True)
+    codes = grouped.ngroup().to_numpy()
+    keys = grouped.size().index.to_frame(index=False)[group_columns]
+    groups = len(keys)
+    columns = {}
+    for column in numeric_columns:
+        if column not in df.columns:
+            continue
+        values = df[column].to_numpy(dtype='float64')
+        valid = ~np.isnan(values)
+        values, column_codes = values[valid], codes[valid]
+        edges, exact = sketch_edges(values, bins) if len(values) else (np.empty(0), True)
+        if exact:
+            positions = np.searchsorted(edges, values)
+        else:
+            positions = np.clip(np.searchsorted(edges, values, side='right') - 1, 0, len(edges) - 2)
+        width = max(len(edges) - (0 if exact else 1), 1)
+        minimum = np.full(groups, np.inf)
+        maximum = np.full(groups, -np.inf)
+        np.minimum.at(minimum, column_codes, values)
+        np.maximum.at(maximum, column_codes, values)
+        columns[column] = {
+            'edges': edges,
+            'exact': exact,
+            'count': np.bincount(column_codes, minlength=groups),
+            'sum': np.bincount(column_codes, weights=values, minlength=groups),
+            'sumsq': np.bincount(column_codes, weights=values ** 2, minlength=groups),
+            'min': minimum,
+            'max': maximum,
+            'histogram': np.bincount(column_codes * width + positions, minlength=groups * width)
+            .reshape(groups, width).astype(np.int32),
+        }
+    return {'keys': keys, 'columns': columns}
+
+
+def group_mask(statistics, categories):
+    """
+    Маска групп для выбранных категорий ({колонка: значения}, пустой выбор — все значения).
+    None, если фильтр задан по колонке, которой нет среди ключей групп.
+    """
+    mask = np.ones(len(statistics['keys']), dtype=bool)
+    for column, values in categories.items():
+        if not len(values):
+            continue
+        if column not in statistics['keys'].columns:
+            return None
+        mask &= statistics['keys'][column].isin(list(values)).to_numpy()
+    return mask
+
+
+def sketch_quantiles(edges, exact, histogram, quantiles):
+    """Квантили по слитой гистограмме с линейной интерполяцией между рангами, как в pandas."""
+    total = histogram.sum()
+    cumulative = np.cumsum(histogram)
+
+    def value_at(rank):
+        position = np.searchsorted(cumulative, rank, side='right')
+        if exact:
+            return edges[position]
+        before = cumulative[position] - histogram[position]
+        fraction = (rank - before + 0.5) / histogram[position]
+        return edges[position] + fraction * (edges[position + 1] - edges[position])
+
+    result = []
+    for quantile in quantiles:
+        rank = quantile * (total - 1)
+        low, high = value_at(np.floor(rank)), value_at(np.ceil(rank))
+        result.append(low + (rank - np.floor(rank)) * (high - low))
+    return result
+
+
+def describe_groups(statistics, mask, columns=None):
+    """Аналог DataFrame.describe() для строк выбранных групп, собранный из частичных статистик."""
+    result = {}
+    for column in columns or statistics['columns']:
+        parts = statistics['columns'][column]
+        count = parts['count'][mask].sum()
+        if count == 0:
+            result[column] = [0] + [np.nan] * 7
+            continue
+        total = parts['sum'][mask].sum()
+        mean = total / count
+        std = np.sqrt(max(parts['sumsq'][mask].sum() - total * mean, 0) / (count - 1)) if count > 1 else np.nan
+        minimum, maximum = parts['min'][mask].min(), parts['max'][mask].max()
+        quartiles = sketch_quantiles(parts['edges'], parts['exact'], parts['histogram'][mask].sum(axis=0), [0.25, 0.5, 0.75])
+        result[column] = [count, mean, std, minimum] + [min(max(q, minimum), maximum) for q in quartiles] + [maximum]
+    return pd.DataFrame(result, index=['count', 'mean', 'std', 'min', '25%', '50%', '75%', 'max'])
+
+
+def group_means(statistics, mask, column, by):
+    """Среднее колонки по значениям ключа by для выбранных групп (как groupby(by)[column].mean())."""
+    parts = statistics['columns'][column]
+    frame = pd.DataFrame({by: statistics['keys'][by].to_numpy()[mask],
+                          'sum': parts['sum'][mask], 'count': parts['count'][mask]})
+    totals = frame.groupby(by, observed=True)[['sum', 'count']].sum()
+    totals = totals[totals['count'] > 0]
+    return totals['sum'] / totals['count']
+
+
+def top_k_crosstab(row_codes, row_labels, column_codes, column_labels, top_k=20, other="Other"):
+    """
+    Таблица сопряжённости по кодам категорий (-1 — пропуск) через один bincount:
+    остаются top_k самых частых строк, остальные складываются в строку other.
+    """
+    valid = (row_codes >= 0) & (column_codes >= 0)
+    width = len(column_labels)
+    counts = np.bincount(row_codes[valid] * width + column_codes[valid],
+                         minlength=len(row_labels) * width).reshape(len(row_labels), width)
+    totals = counts.sum(axis=1)
+    top = np.argsort(-totals, kind='stable')[:min(top_k, len(totals))]
+    top = top[totals[top] > 0]
+    table = pd.DataFrame(counts[top], index=pd.Index(np.asarray(row_labels)[top]), columns=list(column_labels))
+    rest = np.setdiff1d(np.flatnonzero(totals), top)
+    if len(rest):
+        table.loc[other] = counts[rest].sum(axis=0)
+    return table.loc[:, table.sum(axis=0) > 0].sort_index(axis=1)
@@ -0,0 +1,95 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+
+MAX_WORKERS = 3
+MAX_RESULTS = 32
+
+# Признак отмены задачи, которую выполняет текущий поток пула
+current = threading.local()
+
+
+class JobCancelled(Exception):
+    """Задача прервана в точке отмены: её ключ больше не нужен панели."""
+
+
+def rows_key(rows):
+    """Короткий хеш набора строк — ключ состояния фильтров."""
+    return hashlib.sha1(np.ascontiguousarray(rows).tobytes()).hexdigest()[:16]
+
+
+def check_cancelled():
+    """Точка отмены между этапами задачи; вне фоновой задачи ничего не делает."""
+    token = getattr(current, "token", None)
+    if token is not None and token.is_set():
+        raise JobCancelled()
+
+
+class JobScheduler:
+    """
+    Фоновые вычисления для тяжёлых разделов панели в пуле потоков сессии.
+    Задача определяется ключом (раздел и его входные данные): завершённая задача с тем же ключом
+    (результат или ошибка) возвращается сразу, уже запущенная задача не дублируется, а задачи с ключами, которые
+    больше не нужны (фильтры изменились), отменяются: ожидающие в очереди — сразу,
+    выполняющиеся — в ближайшей точке отмены (check_cancelled) внутри задачи.
+    """
+
+    def __init__(self, max_workers=MAX_WORKERS, max_results=MAX_RESULTS):
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="dashboard-job")
+        self.max_results = max_results
+        self.pending = {}
+        self.results = OrderedDict()
+        self.lock = threading.Lock()
+
+    def submit(self, key, function, *args):
+        with self.lock:
+            if key in self.results:
+                self.results.move_to_end(key)
+                return self.results[key]
+            if key in self.pending and not self.pending[key][1].is_set():
+                return self.pending[key][0]
+            # Контекст запуска скрипта передаётся в поток пула: без него кэши Streamlit внутри задачи не работают
+            token = threading.Event()
+            future = self.executor.submit(self.run, get_script_run_ctx(suppress_warning=True), token, function, *args)
+            self.pending[key] = (future, token)
+        future.add_done_callback(lambda done: self.finish(key, done))
+        return future
+
+    @staticmethod
+    def run(ctx, token, function, *args):
+        # Потоки пула переиспользуются: контекст и признак отмены задаются заново для каждой задачи
+        if ctx is not None:
+            add_script_run_ctx(threading.current_thread(), ctx)
+        current.token = token
+        try:
+            check_cancelled()
+            return function(*args)
+        finally:
+            current.token = None
+
+    def finish(self, key, future):
+        with self.lock:
+            if key in self.pending and self.pending[key][0] is future:
+                del self.pending[key]
+            # Ошибка тоже запоминается, иначе каждый перезапуск страницы повторял бы упавшую задачу
+            if future.cancelled() or isinstance(future.exception(), JobCancelled):
+                return
+            self.results[key] = future
+            self.results.move_to_end(key)
+            while len(self.results) > self.max_results:
+                self.results.popitem(last=False)
+
+    def cancel_stale(self, keys):
+        """
+        Отменяет задачи, ключей которых нет среди keys: ожидающие не запускаются,
+        а выполняющиеся прерываются в следующей точке отмены и ничего не кэшируют.
+        """
+        with self.lock:
+            stale = [self.pending[key] for key in self.pending if key not in keys]
+        for future, token in stale:
+            token.set()
+            future.cancel()
@@ -0,0 +1,124 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+MAX_HASH = np.uint64((1 << 32) - 1)
+NUM_PERM = 128
+SHINGLE_SIZE = 3
+BATCH_SIZE = 2000
+
+
+def permutations(num_perm=NUM_PERM, seed=1):
+    """Параметры (a, b) универсальных хеш-функций вида (a*x + b) mod p для MinHash."""
+    rng = np.random.default_rng(seed)
+    a = rng.integers(1, 1 << 32, num_perm, dtype=np.uint64)
+    b = rng.integers(0, 1 << 32, num_perm, dtype=np.uint64)
+    return a, b
+
+
+def normalize_text(texts):
+    """Нижний регистр, без пунктуации и лишних пробелов: правки пробелов и знаков не меняют шинглы."""
+    return (pd.Series(texts, dtype='object').fillna('').astype(str).str.lower()
+            .str.replace(r'[^\w\s]+', ' ', regex=True)
+            .str.replace(r'\s+', ' ', regex=True).str.strip())
+
+
+def minhash_batch(texts, num_perm=NUM_PERM, shingle_size=SHINGLE_SIZE, seed=1):
+    """
+    MinHash-сигнатуры блока описаний по словесным шинглам: матрица (документы × num_perm) uint32.
+    Все шинглы блока хешируются одним вызовом, минимумы считаются через np.minimum.reduceat.
+    """
+    a, b = permutations(num_perm, seed)
+    words = normalize_text(texts).str.split(' ')
+    shingles, owners = [], []
+    for doc, tokens in enumerate(words):
+        doc_shingles = {' '.join(tokens[i:i + shingle_size]) for i in range(max(len(tokens) - shingle_size + 1, 1))}
+        shingles.extend(doc_shingles)
+        owners.extend([doc] * len(doc_shingles))
+
+    hashes = pd.util.hash_array(np.asarray(shingles, dtype=object)) & MAX_HASH
+    values = ((hashes[:, None] * a[None, :] + b[None, :]) % MERSENNE_PRIME) & MAX_HASH
+    starts = np.flatnonzero(np.r_[True, np.diff(owners) != 0])
+    return np.minimum.reduceat(values, starts, axis=0).astype(np.uint32)
+
+
+def compute_signatures(texts, num_perm=NUM_PERM, batch_size=BATCH_SIZE, max_workers=None):
+    """Сигнатуры для всех описаний: блоки по batch_size обрабатываются параллельно в пуле процессов."""
+    texts = list(texts)
+    batches = [texts[start:start + batch_size] for start in range(0, len(texts), batch_size)]
+    if not batches:
+        return np.empty((0, num_perm), dtype=np.uint32)
+    if max_workers == 1 or len(batches) == 1:
+        results = [minhash_batch(batch, num_perm) for batch in batches]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers or os.cpu_count()) as executor:
+            results = list(executor.map(minhash_batch, batches, [num_perm] * len(batches)))
+    return np.vstack(results)
+
+
+def choose_bands(threshold, num_perm=NUM_PERM):
+    """
+    Число полос b и строк r (b*r = num_perm) с наименьшей суммой площадей ложных срабатываний
+    (сходство ниже threshold) и пропусков (сходство выше threshold) S-кривой 1 - (1 - s^r)^b.
+    """
+    below = np.linspace(0, threshold, 200)
+    above = np.linspace(threshold, 1, 200)
+    options = [(bands, num_perm // bands) for bands in range(1, num_perm + 1) if num_perm % bands == 0]
+    errors = [np.mean(1 - (1 - below ** rows) ** bands) * threshold
+              + np.mean((1 - above ** rows) ** bands) * (1 - threshold)
+              for bands, rows in options]
+    return options[int(np.argmin(errors))]
+
+
+def candidate_pairs(signatures, threshold):
+    """
+    LSH-разбиение на полосы: документы с одинаковой полосой попадают в одну корзину.
+    Каждый член корзины сравнивается только с её первым документом, поэтому число пар
+    линейно по размеру корзины, а общее время — субквадратичное.
+    """
+    bands, rows = choose_bands(threshold, signatures.shape[1])
+    pairs = set()
+    for band in range(bands):
+        band_values = pd.DataFrame(signatures[:, band * rows:(band + 1) * rows])
+        keys = pd.util.hash_pandas_object(band_values, index=False).to_numpy()
+        order = np.argsort(keys, kind='stable')
+        sorted_keys = keys[order]
+        first = np.r_[True, sorted_keys[1:] != sorted_keys[:-1]]
+        leaders = order[np.flatnonzero(first)[np.cumsum(first) - 1]]
+        members = order[~first]
+        pairs.update(zip(leaders[~first].tolist(), members.tolist()))
+    return pairs
+
+
+def find_near_duplicates(texts, threshold=0.8, num_perm=NUM_PERM, max_workers=None):
+    """
+    Находит кластеры почти-дубликатов описаний с оценкой сходства Жаккара не ниже threshold.
+    Одинаковые после нормализации тексты сводятся к одному перед расчётом сигнатур, пустые пропускаются.
+    Возвращает DataFrame: 'Кластер', 'Строка' (позиция в texts) и 'Размер кластера'.
+    """
+    normalized = normalize_text(texts).reset_index(drop=True)
+    normalized = normalized[normalized != '']
+    codes, unique_texts = pd.factorize(normalized)
+    signatures = compute_signatures(unique_texts, num_perm, max_workers=max_workers)
+    parent = np.arange(len(unique_texts))
+
+    def find(node):
+        while parent[node] != node:
+            parent[node] = parent[parent[node]]
+            node = parent[node]
+        return node
+
+    for left, right in candidate_pairs(signatures, threshold):
+        if np.mean(signatures[left] == signatures[right]) >= threshold:
+            parent[find(left)] = find(right)
+
+    roots = np.array([find(node) for node in range(len(unique_texts))], dtype=np.int64)
+    clusters = pd.DataFrame({'Строка': normalized.index.to_numpy(), 'root': roots[codes]})
+    sizes = clusters.groupby('root')['Строка'].transform('size')
+    clusters = clusters[sizes > 1].copy()
+    clusters['Кластер'] = clusters.groupby('root').ngroup()
+    clusters['Размер кластера'] = sizes[sizes > 1]
+    return clusters[['Кластер', 'Строка', 'Размер кластера']].sort_values(['Кластер', 'Строка']).reset_index(drop=True)
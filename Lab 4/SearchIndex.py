@@ -0,0 +1,162 @@
+import glob
+import os
+
+import numpy as np
+import pandas as pd
+
+from FileVersions import file_fingerprint
+from TermCounts import TOKEN_PATTERN
+
+INDEX_DIR = '.snapshots'
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+
+def build_inverted_index(term_counts):
+    """
+    Инвертированный индекс из матрицы частот: для каждого слова — отсортированный список номеров строк
+    и частоты слова в них (CSC-представление матрицы), плюс длины документов для BM25.
+    """
+    postings = term_counts['matrix'].tocsc()
+    postings.sort_indices()
+    return {
+        'vocabulary': np.asarray(term_counts['vocabulary'], dtype=str),
+        'indptr': postings.indptr.astype(np.int64),
+        'rows': postings.indices.astype(np.int32),
+        'frequencies': postings.data.astype(np.int32),
+        'lengths': np.asarray(term_counts['matrix'].sum(axis=1)).ravel().astype(np.int32),
+    }
+
+
+def save_index(index, path):
+    """Сохраняет словарь массивов в .npz (атомарно, через временный файл)."""
+    temp_path = f"{path}.{os.getpid()}.tmp.npz"
+    np.savez(temp_path, **index)
+    os.replace(temp_path, path)
+
+
+def load_index(path):
+    with np.load(path, allow_pickle=False) as archive:
+        return {name: archive[name] for name in archive.files}
+
+
+def load_or_build_arrays(source_path, build, name, index_dir=INDEX_DIR):
+    """
+    Загружает набор массивов (индекс, матрицу частот), сохранённый для текущего содержимого source_path,
+    или строит его функцией build() и сохраняет на диск, удаляя сохранения прежних версий файла.
+    """
+    index_path = os.path.join(index_dir, f"{name}-{file_fingerprint(source_path)}.npz")
+    if os.path.exists(index_path):
+        return load_index(index_path)
+
+    index = build()
+    try:
+        os.makedirs(index_dir, exist_ok=True)
+        save_index(index, index_path)
+    except OSError as e:
+        print(f"Файл {index_path} не сохранён: {e}")
+        return index
+    for stale_path in glob.glob(os.path.join(index_dir, f"{name}-*.npz")):
+        if stale_path != index_path:
+            os.remove(stale_path)
+    return index
+
+
+def term_positions(index):
+    return pd.Series(np.arange(len(index['vocabulary'])), index=index['vocabulary'])
+
+
+def postings(index, term, positions=None):
+    """Отсортированные номера строк с данным словом и частоты слова в них."""
+    positions = term_positions(index) if positions is None else positions
+    if term not in positions.index:
+        return np.empty(0, dtype=np.int32), np.empty(0, dtype=np.int32)
+    position = positions[term]
+    start, end = index['indptr'][position], index['indptr'][position + 1]
+    return index['rows'][start:end], index['frequencies'][start:end]
+
+
+def parse_query(query):
+    """
+    Разбирает булев запрос: части, разделённые OR (в любом регистре), объединяются; слова внутри части
+    пересекаются (AND), слова с минусом или после NOT исключаются. OR в начале, в конце или подряд
+    пустых частей не создаёт. Возвращает список пар (включаемые слова, исключаемые слова).
+    """
+    clauses = []
+    include, exclude = [], []
+    negate = False
+    for token in query.split() + ['OR']:
+        if token.upper() == 'OR':
+            if include or exclude:
+                clauses.append((include, exclude))
+            include, exclude = [], []
+            negate = False
+            continue
+        if token == 'NOT':
+            negate = True
+            continue
+        words = TOKEN_PATTERN.findall(token.lower())
+        (exclude if negate or token.startswith('-') else include).extend(words)
+        negate = False
+    return clauses
+
+
+def all_rows(index, allowed=None):
+    return np.arange(len(index['lengths']), dtype=np.int32) if allowed is None else np.asarray(allowed)
+
+
+def boolean_search(index, query, allowed=None):
+    """
+    Номера строк, подходящих под булев запрос, пересечением и объединением списков вхождений.
+    allowed — отсортированные номера строк, прошедших остальные фильтры.
+    """
+    positions = term_positions(index)
+    result = np.empty(0, dtype=np.int32)
+    for include, exclude in parse_query(query):
+        # Начинаем с самого короткого списка вхождений — пересечения остаются маленькими.
+        # Часть только из исключений — все допустимые строки без исключённых слов
+        lists = sorted((postings(index, word, positions)[0] for word in include), key=len)
+        if not lists:
+            matched = all_rows(index, allowed)
+        else:
+            matched = lists[0] if allowed is None else np.intersect1d(lists[0], allowed, assume_unique=True)
+        for rows in lists[1:]:
+            matched = np.intersect1d(matched, rows, assume_unique=True)
+        for word in exclude:
+            matched = np.setdiff1d(matched, postings(index, word, positions)[0], assume_unique=True)
+        result = np.union1d(result, matched)
+    return result
+
+
+def bm25_search(index, query, allowed=None, k1=BM25_K1, b=BM25_B):
+    """
+    Ранжирование BM25 по словам запроса (хотя бы одно слово должно встречаться), без строк с исключёнными словами.
+    Возвращает Series: номер строки → оценка, по убыванию оценки.
+    """
+    positions = term_positions(index)
+    lengths = index['lengths']
+    average = lengths.mean() if len(lengths) else 0
+    clauses = parse_query(query)
+    words = [word for include, _ in clauses for word in include]
+    excluded = [word for _, exclude in clauses for word in exclude]
+    if excluded:
+        # Строки с исключёнными словами не ранжируются; запрос только из исключений — остальные строки с оценкой 0
+        removed = np.unique(np.concatenate([postings(index, word, positions)[0] for word in excluded]))
+        allowed = np.setdiff1d(all_rows(index, allowed), removed, assume_unique=True)
+        if not words:
+            return pd.Series(0.0, index=allowed)
+    scores = {}
+    for word in dict.fromkeys(words):
+        rows, frequencies = postings(index, word, positions)
+        if allowed is not None:
+            keep = np.isin(rows, allowed, assume_unique=True)
+            rows, frequencies = rows[keep], frequencies[keep]
+        if len(rows) == 0:
+            continue
+        document_frequency = index['indptr'][positions[word] + 1] - index['indptr'][positions[word]]
+        idf = np.log(1 + (len(lengths) - document_frequency + 0.5) / (document_frequency + 0.5))
+        score = idf * frequencies * (k1 + 1) / (frequencies + k1 * (1 - b + b * lengths[rows] / average))
+        scores[word] = pd.Series(score, index=rows)
+    if not scores:
+        return pd.Series(dtype='float64')
+    return pd.concat(scores.values()).groupby(level=0).sum().sort_values(ascending=False)
@@ -0,0 +1,254 @@
+import os
+import re
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+TOKEN_PATTERN = re.compile(r'\b\w+\b')
+CHUNK_SIZE = 20000  # Описаний в одном блоке токенизации
+MIN_DOCUMENT_FRACTION = 0.01  # Доля отфильтрованных описаний, в которой должно встречаться слово для корреляции
+MIN_DOCUMENTS = 5
+
+
+def tokenize_chunk(descriptions):
+    """
+    Токенизирует блок описаний: частоты слов каждого документа в виде частей CSR-матрицы
+    с локальным словарём блока. Пропуски дают пустые строки матрицы и длину NaN.
+    """
+    vocabulary = {}
+    indptr, indices, data, lengths = [0], [], [], []
+    for description in descriptions:
+        if isinstance(description, str):
+            text = description.lower()
+            counts = Counter(TOKEN_PATTERN.findall(text))
+            lengths.append(len(text.split()))
+        else:
+            counts = Counter()
+            lengths.append(np.nan)
+        for word, count in counts.items():
+            indices.append(vocabulary.setdefault(word, len(vocabulary)))
+            data.append(count)
+        indptr.append(len(indices))
+    return list(vocabulary), np.array(indptr, dtype=np.int64), np.array(indices, dtype=np.int64), \
+        np.array(data, dtype=np.int32), np.array(lengths, dtype='float64')
+
+
+def hash_terms(words, n_features):
+    """Номера столбцов для слов в режиме хеширования (стабильный 64-битный хеш по модулю n_features)."""
+    if len(words) == 0:
+        return np.empty(0, dtype=np.int64)
+    return (pd.util.hash_array(np.asarray(words, dtype=object)) % np.uint64(n_features)).astype(np.int64)
+
+
+def tokenize_chunks(descriptions, chunk_size=CHUNK_SIZE, max_workers=None):
+    descriptions = list(descriptions)
+    chunks = [descriptions[start:start + chunk_size] for start in range(0, len(descriptions), chunk_size)]
+    if max_workers == 1 or len(chunks) <= 1:
+        return [tokenize_chunk(chunk) for chunk in chunks]
+    with ProcessPoolExecutor(max_workers=max_workers or os.cpu_count()) as executor:
+        return list(executor.map(tokenize_chunk, chunks))
+
+
+def merge_chunks(results, vocabulary=None, n_features=None):
+    """
+    Сливает блоки токенизации в CSR-матрицу. В режиме словаря локальные словари блоков дописываются
+    в общий словарь vocabulary (слово → столбец), в режиме хеширования столбец — хеш слова.
+    """
+    blocks, lengths = [], []
+    for words, indptr, indices, data, chunk_lengths in results:
+        if n_features is None:
+            mapping = np.array([vocabulary.setdefault(word, len(vocabulary)) for word in words], dtype=np.int64)
+        else:
+            mapping = hash_terms(words, n_features)
+        blocks.append((indptr, mapping[indices] if len(indices) else indices, data))
+        lengths.append(chunk_lengths)
+    width = len(vocabulary) if n_features is None else n_features
+    matrix = sparse.vstack([sparse.csr_matrix((data, indices, indptr), shape=(len(indptr) - 1, width))
+                            for indptr, indices, data in blocks], format='csr') if blocks \
+        else sparse.csr_matrix((0, width), dtype=np.int32)
+    # Повторяющиеся хеши одного документа складываются
+    matrix.sum_duplicates()
+    return matrix, np.concatenate(lengths) if lengths else np.empty(0)
+
+
+def build_term_counts(descriptions, chunk_size=CHUNK_SIZE, max_workers=None, n_features=None):
+    """
+    Частоты слов по документам для всех описаний: блоки токенизируются параллельно в пуле процессов,
+    затем локальные словари сливаются в общий. Возвращает словарь:
+    'matrix' — CSR-матрица (документы × слова), 'vocabulary' — массив слов, 'lengths' — длина описаний в словах.
+    Если задан n_features, словарь не строится: слова хешируются в n_features столбцов, и новые
+    документы можно добавлять без перестройки словаря; 'vocabulary' тогда содержит номера столбцов.
+    """
+    vocabulary = {}
+    matrix, lengths = merge_chunks(tokenize_chunks(descriptions, chunk_size, max_workers), vocabulary, n_features)
+    return {
+        'matrix': matrix,
+        'vocabulary': np.array(list(vocabulary), dtype=object) if n_features is None else np.arange(n_features),
+        'lengths': lengths,
+        'n_features': n_features,
+    }
+
+
+def append_term_counts(term_counts, descriptions, chunk_size=CHUNK_SIZE, max_workers=None):
+    """
+    Добавляет новые описания в конец матрицы частот без повторной токенизации старых.
+    В режиме хеширования столбцы не меняются; в режиме словаря новые слова дописываются в конец словаря.
+    """
+    n_features = term_counts.get('n_features')
+    vocabulary = None if n_features is not None else {word: i for i, word in enumerate(term_counts['vocabulary'])}
+    matrix, lengths = merge_chunks(tokenize_chunks(descriptions, chunk_size, max_workers), vocabulary, n_features)
+    old = term_counts['matrix']
+    if n_features is None:
+        old = sparse.csr_matrix((old.data, old.indices, old.indptr), shape=(old.shape[0], len(vocabulary)))
+    return {
+        'matrix': sparse.vstack([old, matrix], format='csr'),
+        'vocabulary': np.array(list(vocabulary), dtype=object) if n_features is None else term_counts['vocabulary'],
+        'lengths': np.concatenate([term_counts['lengths'], lengths]),
+        'n_features': n_features,
+    }
+
+
+def term_counts_to_arrays(term_counts):
+    """Матрица частот в виде набора массивов для сохранения в .npz."""
+    matrix = term_counts['matrix']
+    return {
+        'data': matrix.data, 'indices': matrix.indices, 'indptr': matrix.indptr, 'shape': np.array(matrix.shape),
+        'vocabulary': np.asarray(term_counts['vocabulary'], dtype=str if term_counts.get('n_features') is None else np.int64),
+        'lengths': term_counts['lengths'],
+        'n_features': np.array(term_counts.get('n_features') or 0),
+    }
+
+
+def term_counts_from_arrays(arrays):
+    n_features = int(arrays['n_features']) or None
+    return {
+        'matrix': sparse.csr_matrix((arrays['data'], arrays['indices'], arrays['indptr']), shape=tuple(arrays['shape'])),
+        'vocabulary': arrays['vocabulary'].astype(object) if n_features is None else arrays['vocabulary'],
+        'lengths': arrays['lengths'],
+        'n_features': n_features,
+    }
+
+
+def term_positions(term_counts, terms):
+    """Номера столбцов слов terms (-1 для слов вне словаря); в режиме хеширования — хеши слов."""
+    terms = list(terms)
+    if term_counts.get('n_features') is not None:
+        return hash_terms(terms, term_counts['n_features'])
+    positions = pd.Series(np.arange(len(term_counts['vocabulary'])), index=term_counts['vocabulary'])
+    return positions.reindex(terms).fillna(-1).astype(np.int64).to_numpy()
+
+
+def term_totals(term_counts, rows=None):
+    """Суммарные частоты слов по выбранным документам (rows — позиции строк, None — все)."""
+    matrix = term_counts['matrix'] if rows is None else term_counts['matrix'][rows]
+    return pd.Series(np.asarray(matrix.sum(axis=0)).ravel(), index=term_counts['vocabulary'])
+
+
+def top_terms(term_counts, rows=None, k=10, exclude=()):
+    """k самых частых слов в выбранных документах без слов из exclude."""
+    totals = term_totals(term_counts, rows)
+    totals = totals[totals > 0]
+    return totals[~totals.index.isin(list(exclude))].nlargest(k)
+
+
+def average_length(term_counts, rows=None):
+    """Средняя длина описания в словах по выбранным документам (пропуски не учитываются)."""
+    lengths = term_counts['lengths'] if rows is None else term_counts['lengths'][rows]
+    return float(np.nanmean(lengths)) if np.any(~np.isnan(lengths)) else np.nan
+
+
+def sparse_correlation(matrix, target):
+    """
+    Корреляция Пирсона каждого столбца разреженной матрицы с target без перевода матрицы в плотную:
+    суммы и суммы квадратов столбцов плюс произведение X^T на центрированный target — время O(nnz).
+    Столбцы с нулевой дисперсией дают NaN.
+    """
+    n = matrix.shape[0]
+    centered = np.asarray(target, dtype='float64') - np.mean(target)
+    sums = np.asarray(matrix.sum(axis=0)).ravel()
+    squares = np.asarray(matrix.multiply(matrix).sum(axis=0)).ravel()
+    covariance = matrix.T @ centered
+    variance = squares - sums ** 2 / n
+    with np.errstate(divide='ignore', invalid='ignore'):
+        correlation = covariance / np.sqrt(variance * np.dot(centered, centered))
+    return np.where(variance > 0, correlation, np.nan)
+
+
+def term_correlations(term_counts, rows, targets, exclude=(), min_df=MIN_DOCUMENT_FRACTION):
+    """
+    Корреляция частот слов с числовыми колонками targets (DataFrame, выровненный с rows).
+    Строки с пропуском в колонке не учитываются; слова, встреченные меньше чем в min_df документах, отбрасываются.
+    min_df — число документов или (float) доля от rows, но не меньше MIN_DOCUMENTS: корреляция слова
+    из нескольких описаний случайна и иначе оказывалась бы в начале рейтинга.
+    """
+    if isinstance(min_df, float):
+        min_df = max(MIN_DOCUMENTS, int(np.ceil(min_df * len(rows))))
+    matrix = term_counts['matrix'][rows]
+    document_frequency = np.asarray((matrix > 0).sum(axis=0)).ravel()
+    keep = (document_frequency >= min_df) & ~pd.Index(term_counts['vocabulary']).isin(list(exclude))
+    matrix = matrix[:, np.flatnonzero(keep)].tocsr()
+    result = {}
+    for column in targets.columns:
+        valid = targets[column].notna().to_numpy()
+        result[column] = sparse_correlation(matrix[valid], targets[column].to_numpy()[valid]) if valid.any() \
+            else np.full(matrix.shape[1], np.nan)
+    return pd.DataFrame(result, index=term_counts['vocabulary'][keep])
+
+
+def term_column(term_counts, rows, term):
+    """Частоты одного слова в выбранных документах в виде плотного массива (для графиков)."""
+    position = term_positions(term_counts, [term])[0]
+    if position < 0:
+        return np.zeros(len(rows))
+    return term_counts['matrix'][rows][:, position].toarray().ravel()
+
+
+def group_term_means(term_counts, rows, groups, terms, values=None):
+    """
+    Средние частоты слов terms по группам (например, сортам) через разреженную матрицу-индикатор:
+    (группы × документы) · (документы × слова) вместо groupby по плотной таблице.
+    values — DataFrame числовых колонок, выровненный с rows; их средние по группам считаются без пропусков.
+    """
+    codes, uniques = pd.factorize(pd.Series(groups).reset_index(drop=True), sort=True)
+    indicator = sparse.csr_matrix((np.ones(len(codes)), (codes, np.arange(len(codes)))), shape=(len(uniques), len(codes)))
+    sizes = np.asarray(indicator.sum(axis=1)).ravel()
+
+    columns = pd.Series(term_positions(term_counts, terms), index=list(terms))
+    columns = columns[columns >= 0]
+    sums = indicator @ term_counts['matrix'][rows][:, columns.to_numpy()]
+    means = pd.DataFrame(np.asarray(sums.todense()) / sizes[:, None], index=uniques, columns=columns.index)
+
+    if values is not None:
+        present = values.notna().to_numpy(dtype='float64')
+        totals = indicator @ np.nan_to_num(values.to_numpy(dtype='float64'))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            means[list(values.columns)] = totals / (indicator @ present)
+    return means
+
+
+def term_target_histograms(term_counts, rows, terms, target, bins=40):
+    """
+    Двумерные гистограммы (частота слова × значение target) сразу для всех слов terms.
+    Ненулевые частоты берутся из разреженной матрицы за один проход (O(nnz)); строка нулевой частоты —
+    разность общей гистограммы target и суммы ненулевых. Строки с пропуском в target не учитываются.
+    Возвращает (массив слова × частоты 0..max × корзины target, границы корзин target).
+    """
+    target = np.asarray(target, dtype='float64')
+    valid = ~np.isnan(target)
+    rows, target = np.asarray(rows)[valid], target[valid]
+    edges = np.histogram_bin_edges(target, bins=bins) if len(target) else np.linspace(0, 1, bins + 1)
+    target_bins = np.clip(np.searchsorted(edges, target, side='right') - 1, 0, bins - 1)
+
+    columns = term_positions(term_counts, terms)
+    matrix = term_counts['matrix'][rows][:, np.maximum(columns, 0)].tocoo()
+    present = columns[matrix.col] >= 0
+    words, documents, counts = matrix.col[present], matrix.row[present], matrix.data[present]
+    width = int(counts.max()) + 1 if len(counts) else 1
+
+    flat = (words * width + counts) * bins + target_bins[documents]
+    histograms = np.bincount(flat, minlength=len(columns) * width * bins).reshape(len(columns), width, bins)
+    histograms[:, 0, :] = np.bincount(target_bins, minlength=bins) - histograms[:, 1:, :].sum(axis=1)
+    return histograms, edges
@@ -0,0 +1,102 @@
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+# Схема набора данных о винах: строки с небольшим числом значений — категории, числа — float32
+WINE_DTYPES = {
+    "country": "category",
+    "province": "category",
+    "region_1": "category",
+    "region_2": "category",
+    "variety": "category",
+    "winery": "category",
+    "category": "category",
+    "taster_name": "category",
+    "points": "float32",
+    "price": "float32",
+    "alcohol": "float32",
+}
+# Колонки, которые сжимаются до int16, если в них нет пропусков и дробных значений
+INTEGER_COLUMNS = {"points": "int16"}
+# Колонки, которые использует панель анализа (остальные не читаются)
+DASHBOARD_COLUMNS = ["country", "description", "points", "price", "alcohol", "category", "variety",
+                     "region_1", "title", "winery"]
+
+
+def compact_integers(df):
+    """Переводит целочисленные колонки без пропусков в int16 (баллы 80–100 не требуют float)."""
+    for column, dtype in INTEGER_COLUMNS.items():
+        if column in df.columns and df[column].notna().all():
+            values = df[column].to_numpy()
+            if np.array_equal(values, np.round(values)) and np.abs(values).max(initial=0) <= np.iinfo(dtype).max:
+                df[column] = values.astype(dtype)
+    return df
+
+
+def read_wine_csv(path, columns=None, engine="pyarrow"):
+    """
+    Читает CSV о винах по объявленной схеме: только нужные колонки (columns, None — все),
+    категории и float32 сразу при разборе, многопоточный разборщик Arrow (без pyarrow — обычный).
+    """
+    header = pd.read_csv(path, nrows=0).columns
+    usecols = [column for column in header if columns is None or column in columns]
+    dtype = {column: WINE_DTYPES[column] for column in usecols if column in WINE_DTYPES}
+    try:
+        df = pd.read_csv(path, usecols=usecols, dtype=dtype, engine=engine)
+    except ImportError:
+        df = pd.read_csv(path, usecols=usecols, dtype=dtype)
+    return compact_integers(df)
+
+
+def read_wine_parquet(path, columns=None):
+    """Читает колоночную копию данных и приводит колонки к той же схеме, что и read_wine_csv."""
+    if columns is not None:
+        import pyarrow.parquet as pq
+        names = pq.read_schema(path).names
+        columns = [column for column in names if column in columns]
+    df = pd.read_parquet(path, columns=columns)
+    dtype = {column: WINE_DTYPES[column] for column in df.columns if column in WINE_DTYPES}
+    return compact_integers(df.astype(dtype))
+
+
+def csv_to_parquet(csv_path, parquet_path, block_size=1 << 24):
+    """
+    Потоково переписывает CSV в Parquet пакетами Arrow: память ограничена размером пакета.
+    Числа записываются как float32, строки Parquet сам хранит со словарным кодированием.
+    """
+    import pyarrow as pa
+    import pyarrow.csv as pv
+    import pyarrow.parquet as pq
+
+    header = pd.read_csv(csv_path, nrows=0).columns
+    column_types = {column: pa.float32() for column in header if WINE_DTYPES.get(column) == "float32"}
+    column_types.update({column: pa.string() for column in header if column not in column_types})
+    reader = pv.open_csv(csv_path, read_options=pv.ReadOptions(block_size=block_size),
+                         convert_options=pv.ConvertOptions(column_types=column_types))
+    temp_path = f"{parquet_path}.tmp"
+    with pq.ParquetWriter(temp_path, reader.schema, compression="zstd") as writer:
+        for batch in reader:
+            writer.write_batch(batch)
+    os.replace(temp_path, parquet_path)
+
+
+def memory_mb(df):
+    return df.memory_usage(deep=True).sum() / 2 ** 20
+
+
+def load_report(csv_path, parquet_path=None, columns=None):
+    """Память и время загрузки: CSV с выводом типов, CSV по схеме и (если есть) колоночная копия."""
+    loaders = {
+        "CSV, все колонки, типы выводятся": lambda: pd.read_csv(csv_path),
+        "CSV по схеме (Arrow)": lambda: read_wine_csv(csv_path, columns),
+    }
+    if parquet_path is not None:
+        loaders["Parquet по схеме"] = lambda: read_wine_parquet(parquet_path, columns)
+    rows = []
+    for name, load in loaders.items():
+        start = time.perf_counter()
+        df = load()
+        rows.append({"Способ": name, "Время, с": time.perf_counter() - start, "Память, МБ": memory_mb(df)})
+    return pd.DataFrame(rows).set_index("Способ")
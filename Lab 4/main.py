@@ -1,23 +1,131 @@
+import numpy as np
 import pandas as pd
 import streamlit as st
-from wordcloud import WordCloud
+from wordcloud import STOPWORDS, WordCloud
 import matplotlib.pyplot as plt
-from collections import Counter
-import re
+from matplotlib.colors import LogNorm
 import seaborn as sns
-from sklearn.feature_extraction.text import CountVectorizer
+from sklearn.feature_extraction.text import ENGLISH_STOP_WORDS
+
+from FileVersions import file_version
+from FilterEngine import FilterEngine
+from Jobs import JobScheduler, check_cancelled, rows_key
+from GroupStatistics import build_group_statistics, describe_groups, group_mask, group_means, top_k_crosstab
+from SearchIndex import bm25_search, boolean_search, build_inverted_index, load_or_build_arrays
+from TermCounts import (average_length, build_term_counts, group_term_means, term_column, term_correlations,
+                        term_counts_from_arrays, term_counts_to_arrays, term_target_histograms, top_terms)
+from WineSchema import DASHBOARD_COLUMNS, load_report, read_wine_csv, read_wine_parquet
+
+JOB_POLL_SECONDS = 0.5  # Как часто раздел с незавершённой фоновой задачей проверяет её готовность
 
 @st.cache_data
 def load_data(file_path):
-    """Загрузка данных с использованием кэширования."""
-    return pd.read_csv(file_path)
+    """Загрузка данных с использованием кэширования: только нужные колонки, категории и компактные числа."""
+    if file_path.endswith(".parquet"):
+        return read_wine_parquet(file_path, DASHBOARD_COLUMNS)
+    return read_wine_csv(file_path, DASHBOARD_COLUMNS)
 
 
-def calculate_numeric_statistics(df):
-    """Вычисляет статистики для числовых колонок."""
+@st.cache_data
+def load_memory_report(file_path):
+    """Память и время загрузки файла без схемы и по схеме (считается один раз)."""
+    return load_report(file_path, columns=DASHBOARD_COLUMNS)
+
+
+@st.cache_resource
+def load_term_counts(file_path):
+    """
+    Частоты слов по каждому описанию: токенизация выполняется один раз на содержимое файла,
+    словарь и разреженная матрица сохраняются на диск, а фильтры берут из неё строки.
+    """
+    return term_counts_from_arrays(load_or_build_arrays(
+        file_path, lambda: term_counts_to_arrays(build_term_counts(load_data(file_path)["description"])), "term-counts"))
+
+
+@st.cache_resource
+def load_search_index(file_path):
+    """Инвертированный индекс описаний: строится один раз на содержимое файла и хранится на диске."""
+    return load_or_build_arrays(file_path, lambda: build_inverted_index(load_term_counts(file_path)), "description-index")
+
+
+@st.cache_resource
+def load_group_statistics(file_path):
+    """Частичные статистики числовых колонок по группам страна × сорт — один раз на файл."""
+    return build_group_statistics(load_data(file_path))
+
+
+@st.cache_resource
+def load_filter_engine(file_path):
+    """Битовые карты категорий и отсортированные индексы числовых колонок — один раз на файл."""
+    return FilterEngine(add_price_quality_ratio(load_data(file_path)))
+
+
+@st.cache_data(max_entries=32)
+def load_region_category_crosstab(file_path, rows, top_k):
+    """Регионы × категории для состояния фильтров (rows): top_k регионов и Other, по кодам из движка фильтров."""
+    engine = load_filter_engine(file_path)
+    regions, categories = engine.categories["region_1"], engine.categories["category"]
+    return top_k_crosstab(engine.codes["region_1"][rows], regions.index, engine.codes["category"][rows],
+                          categories.index, top_k)
+
+
+def session_jobs():
+    """Планировщик фоновых задач текущей сессии."""
+    if "jobs" not in st.session_state:
+        st.session_state["jobs"] = JobScheduler()
+    return st.session_state["jobs"]
+
+
+@st.cache_data(max_entries=16)
+def render_wordcloud(file_path, version, rows, max_words=200):
+    """
+    Изображение облака слов для версии файла и состояния фильтров (rows): частоты берутся
+    из сохранённой матрицы частот, без повторной токенизации описаний.
+    """
+    term_counts = load_term_counts(file_path)
+    stop_words = STOPWORDS | {word for word in term_counts["vocabulary"] if len(word) < 2}
+    frequencies = top_terms(term_counts, rows, max_words, exclude=stop_words)
+    if frequencies.empty:
+        return None
+    check_cancelled()
+    wordcloud = WordCloud(
+        width=800, height=400, background_color="white", max_words=max_words
+    ).generate_from_frequencies(frequencies.to_dict())
+    return wordcloud.to_array()
+
+
+def description_stop_words(term_counts):
+    """Английские стоп-слова и однобуквенные токены — не участвуют в анализе корреляции."""
+    return ENGLISH_STOP_WORDS | {word for word in term_counts["vocabulary"] if len(word) < 2}
+
+
+@st.cache_data(max_entries=32)
+def load_variety_correlation(file_path, rows, n_varieties, n_words):
+    """
+    Корреляция слов с сортами винограда для текущего состояния фильтров (rows) — только по топ-K сортам
+    и топ-K словам. Средние по сортам считаются произведением разреженной матрицы-индикатора на матрицу частот.
+    """
+    term_counts = load_term_counts(file_path)
+    data = load_data(file_path)
+    words = top_terms(term_counts, rows, n_words, exclude=description_stop_words(term_counts)).index
+    varieties = data.loc[rows, "variety"].astype("object").fillna("Unknown")
+    selected = varieties.isin(varieties.value_counts().head(n_varieties).index).to_numpy()
+    means = group_term_means(term_counts, rows[selected], varieties[selected], words,
+                             data.loc[rows[selected], ["price", "points"]])
+    return means.corr(method="pearson").iloc[:, :-1]  # Убираем столбец points
+
+
+def calculate_numeric_statistics(df, statistics=None, groups=None):
+    """
+    Вычисляет статистики для числовых колонок.
+    Если строки — это целые группы (groups — маска групп), статистики собираются из частичных по группам.
+    """
     st.markdown("### :bar_chart: Статистики для числовых переменных")
     numeric_columns = ["price", "points", "alcohol"]  # Выбираем нужные числовые колонки
-    stats = df[numeric_columns].describe().style.format("{:.2f}")
+    if groups is not None:
+        stats = describe_groups(statistics, groups, numeric_columns).style.format("{:.2f}")
+    else:
+        stats = df[numeric_columns].describe().style.format("{:.2f}")
     st.table(stats)
 
 def add_price_quality_ratio(df):
@@ -25,7 +133,7 @@ def add_price_quality_ratio(df):
     df["price_quality_ratio"] = df["price"] / df["points"]
     return df
 
-def filter_by_price_quality(df):
+def filter_by_price_quality(df, engine, categories):
     """Фильтрация данных по соотношению цена/качество."""
     st.sidebar.markdown("### :mag: Фильтрация по соотношению цена/качество")
     min_ratio = st.sidebar.slider(
@@ -34,18 +142,47 @@ def filter_by_price_quality(df):
     max_ratio = st.sidebar.slider(
         "Максимальное соотношение", float(df["price_quality_ratio"].min()), float(df["price_quality_ratio"].max()), float(df["price_quality_ratio"].max())
     )
-    filtered_df = df[(df["price_quality_ratio"] >= min_ratio) & (df["price_quality_ratio"] <= max_ratio)]
+    # Диапазон по отсортированному индексу и AND с битовыми картами выбранных категорий
+    mask = engine.mask(categories, {"price_quality_ratio": (min_ratio, max_ratio)})
+    filtered_df = df[mask[df.index.to_numpy()]]
     st.markdown("### :clipboard: Отфильтрованные данные по соотношению цена/качество")
     st.dataframe(filtered_df)
     return filtered_df
 
+def select_categories(df):
+    """Дополнительные фильтры по сорту, категории и региону (пустой выбор — без фильтра)."""
+    st.sidebar.markdown("### :label: Фильтр по сорту, категории и региону")
+    return {
+        column: st.sidebar.multiselect(label, options=df[column].dropna().unique())
+        for column, label in [("variety", "Сорт:"), ("category", "Категория:"), ("region_1", "Регион:")]
+        if column in df.columns
+    }
+
+def filter_by_description(df, index):
+    """Поиск по словам в описании: булев запрос или ранжирование BM25 среди уже отфильтрованных строк."""
+    st.sidebar.markdown("### :mag_right: Поиск по описанию")
+    query = st.sidebar.text_input("Слова запроса (AND по умолчанию, OR, NOT или -слово):")
+    mode = st.sidebar.radio("Режим поиска:", ["Булев", "BM25"], horizontal=True)
+    if not query.strip():
+        return df
+    allowed = np.sort(df.index.to_numpy())
+    if mode == "BM25":
+        scores = bm25_search(index, query, allowed)
+        found = df.loc[scores.index].assign(BM25=scores.to_numpy())
+    else:
+        found = df.loc[boolean_search(index, query, allowed)]
+    if found.empty:
+        st.warning("По запросу ничего не найдено.")
+        st.stop()
+    return found
+
 def explore_categorical_variables(df):
     """Анализ распределения для категориальных переменных."""
     st.markdown("### Распределение для категориальных переменных")
 
     # Распределение по странам
     st.markdown("#### Количество вин по странам")
-    country_counts = df["country"].value_counts()
+    country_counts = df["country"].value_counts().loc[lambda counts: counts > 0]
     if not country_counts.empty:
         st.bar_chart(country_counts)
     else:
@@ -53,7 +190,7 @@ def explore_categorical_variables(df):
 
     # Распределение по категориям вин
     st.markdown("#### Количество вин по категориям")
-    category_counts = df["category"].value_counts()
+    category_counts = df["category"].value_counts().loc[lambda counts: counts > 0]
     if not category_counts.empty:
         st.bar_chart(category_counts)
     else:
@@ -61,7 +198,7 @@ def explore_categorical_variables(df):
 
     # Распределение по сортам винограда
     st.markdown("#### Количество вин по сортам винограда (топ-10)")
-    variety_counts = df["variety"].value_counts().head(10)  # Топ-10 сортов
+    variety_counts = df["variety"].value_counts().loc[lambda counts: counts > 0].head(10)  # Топ-10 сортов
     if not variety_counts.empty:
         st.bar_chart(variety_counts)
     else:
@@ -77,10 +214,13 @@ def plot_points_distribution(df):
     ax.set_ylabel("Количество вин")
     st.pyplot(fig)
 
-def plot_average_price_by_country(df):
+def plot_average_price_by_country(df, statistics=None, groups=None):
     """Средние цены по странам."""
     st.markdown("### :bar_chart: Средние цены по странам")
-    avg_price_country = df.groupby("country")["price"].mean().sort_values(ascending=False)
+    if groups is not None:
+        avg_price_country = group_means(statistics, groups, "price", "country").sort_values(ascending=False)
+    else:
+        avg_price_country = df.groupby("country", observed=True)["price"].mean().sort_values(ascending=False)
     fig, ax = plt.subplots(figsize=(12, 8))
     avg_price_country.plot(kind="bar", color="green", ax=ax)
     ax.set_title("Средние цены по странам")
@@ -88,11 +228,12 @@ def plot_average_price_by_country(df):
     ax.set_xlabel("Страна")
     st.pyplot(fig)
 
-def plot_category_region_distribution(df):
+def plot_category_region_distribution(df, file_path):
     """Составной столбчатый график для категорий и регионов."""
     st.markdown("### :bar_chart: Распределение вин по категориям и регионам")
     if "category" in df.columns and "region_1" in df.columns:
-        category_region_counts = pd.crosstab(df["region_1"], df["category"])
+        top_k = st.sidebar.slider("Регионов на графике (остальные — в Other)", 5, 100, 20)
+        category_region_counts = load_region_category_crosstab(file_path, df.index.to_numpy(), top_k)
         fig, ax = plt.subplots(figsize=(14, 8))
         category_region_counts.plot(kind="bar", stacked=True, ax=ax, colormap="viridis")
         ax.set_title("Распределение вин по категориям и регионам")
@@ -103,109 +244,151 @@ def plot_category_region_distribution(df):
         st.warning("Данные о категориях или регионах отсутствуют.")
 
 
-def analyze_description(df):
-    """Анализ описаний вин."""
-    st.markdown("### :speech_balloon: Анализ описаний вин")
-
+def summarize_descriptions(term_counts, rows):
+    """Топ-10 слов без общих слов и средняя длина описаний по заранее посчитанным частотам (фоновая задача)."""
     # Удаление общих слов
     common_words = {"and", "the", "is", "of", "a", "in", "this", "with", "on", "to", "s", "that", "it", "but", "from"}
-    descriptions = df["description"].dropna().str.lower()
-    words = re.findall(r'\b\w+\b', " ".join(descriptions))
-    filtered_words = [word for word in words if word not in common_words]
 
-    # Частота слов
-    word_counts = Counter(filtered_words)
-    most_common_words = word_counts.most_common(10)
+    # Частота слов: сумма заранее посчитанных частот по документам отфильтрованных строк
+    most_common_words = top_terms(term_counts, rows, 10, exclude=common_words)
+    return most_common_words, average_length(term_counts, rows)
+
+
+def analyze_description(summary):
+    """Анализ описаний вин."""
+    st.markdown("### :speech_balloon: Анализ описаний вин")
+    most_common_words, avg_length = summary
     st.write("**Топ-10 самых частых слов в описаниях:**")
-    st.write(pd.DataFrame(most_common_words, columns=["Слово", "Частота"]))
+    st.write(pd.DataFrame({"Слово": most_common_words.index, "Частота": most_common_words.to_numpy()}))
 
     # Средняя длина описаний
-    description_lengths = descriptions.str.split().str.len()
-    avg_length = description_lengths.mean()
     st.write(f"**Средняя длина описания:** {avg_length:.2f} слов")
 
 
-def generate_wordcloud(df):
+def generate_wordcloud(image):
     """Генерация облака слов."""
     st.markdown("### :cloud: Облако слов из описаний вин")
+    if image is None:
+        st.warning("Нет данных для облака слов.")
+        return
 
-    descriptions = df["description"].dropna().str.lower()
-    wordcloud_text = " ".join(descriptions)
+    # Отображение готового изображения без перерисовки через matplotlib
+    st.image(image)
+
+def plot_density(ax, histogram, edges, cmap, title, xlabel, ylabel):
+    """Плотность пар (частота слова, значение) вместо отдельных точек; пустые ячейки не закрашиваются."""
+    counts = np.arange(histogram.shape[0] + 1) - 0.5
+    mesh = ax.pcolormesh(counts, edges, np.ma.masked_equal(histogram.T, 0), cmap=cmap, norm=LogNorm())
+    ax.figure.colorbar(mesh, ax=ax, label="Количество вин")
+    ax.set_xticks(np.arange(histogram.shape[0]))
+    ax.set_title(title)
+    ax.set_xlabel(xlabel)
+    ax.set_ylabel(ylabel)
+
+def correlate_words(file_path, term_counts, rows, targets, mode, n_varieties, n_words):
+    """
+    Вычисления раздела корреляции (фоновая задача): корреляция всех слов словаря с ценой и рейтингом
+    по разреженной матрице, данные графиков для топ-5 слов и корреляция слов с сортами.
+    """
+    # Корреляция всех слов словаря прямо по разреженной матрице частот, без перевода в плотную
+    correlations = term_correlations(term_counts, rows, targets, exclude=description_stop_words(term_counts))
+    price_corr = correlations["price"].sort_values(ascending=False).head(10)
+    points_corr = correlations["points"].sort_values(ascending=False).head(10)
+    scatter_words = list(price_corr.index[:5]) + list(points_corr.index[:5])  # Топ-5 коррелирующих слов с ценой и рейтингом
+    check_cancelled()
+    result = {"price_corr": price_corr, "points_corr": points_corr, "scatter_words": scatter_words, "mode": mode}
+    if mode == "Плотность":
+        # Гистограммы для всех слов за один проход по разреженной матрице
+        result["price_hist"] = term_target_histograms(term_counts, rows, scatter_words, targets["price"])
+        result["points_hist"] = term_target_histograms(term_counts, rows, scatter_words, targets["points"])
+    else:
+        word_df = pd.DataFrame({word: term_column(term_counts, rows, word) for word in scatter_words})
+        word_df["price"] = targets["price"]
+        word_df["points"] = targets["points"]
+        result["word_df"] = word_df
+    if n_varieties:
+        check_cancelled()
+        result["word_variety_corr"] = load_variety_correlation(file_path, rows, n_varieties, n_words)
+    return result
+
+
+def show_job_result(name, future, render):
+    """Раздел с готовым результатом фоновой задачи или с ошибкой, которой задача завершилась."""
+    if future.exception() is not None:
+        st.error(f"Ошибка в разделе {name}: {future.exception()}")
+    else:
+        render(future.result())
 
-    # Генерация облака слов
-    wordcloud = WordCloud(
-        width=800, height=400, background_color="white"
-    ).generate(wordcloud_text)
 
-    # Отображение
-    fig, ax = plt.subplots(figsize=(10, 6))
-    ax.imshow(wordcloud, interpolation="bilinear")
-    ax.axis("off")
-    st.pyplot(fig)
+def poll_job(future):
+    """
+    Заглушка незавершённой задачи (фрагмент с периодическим перезапуском). Скрипт не ждёт задачу,
+    поэтому изменение виджета сразу начинает новый запуск; готовность задачи перезапускает
+    всю страницу, и раздел рисуется из кэша результатов уже без опроса.
+    """
+    if future.done():
+        st.rerun()
+    st.info(":hourglass_flowing_sand: Раздел вычисляется…")
+
+
+def job_section(name, future, render):
+    """Раздел фоновой задачи на своём месте страницы (свой контейнер — отдельный фрагмент для каждого раздела)."""
+    with st.container():
+        if future.done():
+            show_job_result(name, future, render)
+        else:
+            st.fragment(poll_job, run_every=JOB_POLL_SECONDS)(future)
 
-def word_correlation_analysis(df):
+
+def word_correlation_analysis(result):
     """Анализ корреляции наиболее частых слов с ценой, рейтингом и сортами."""
     st.markdown("### :bar_chart: Анализ корреляции слов")
-    
-    # Извлечение описаний
-    descriptions = df["description"].dropna().values
-    if len(descriptions) == 0:
+    if result is None:
         st.warning("Нет данных для анализа корреляции слов.")
         return
 
-    # Создание матрицы частот слов
-    vectorizer = CountVectorizer(max_features=100, stop_words="english")
-    word_matrix = vectorizer.fit_transform(descriptions)
-    word_df = pd.DataFrame(word_matrix.toarray(), columns=vectorizer.get_feature_names_out())
-    
-    # Добавление числовых колонок
-    word_df["price"] = df["price"].reset_index(drop=True)
-    word_df["points"] = df["points"].reset_index(drop=True)
-
     # Корреляция слов с ценой и рейтингом
     st.markdown("#### Корреляция слов с ценой и рейтингом")
-    correlation_matrix = word_df.corr()
-    price_corr = correlation_matrix["price"].sort_values(ascending=False).head(10)
-    points_corr = correlation_matrix["points"].sort_values(ascending=False).head(10)
-    
     st.write("Наиболее коррелирующие слова с ценой:")
-    st.dataframe(price_corr)
+    st.dataframe(result["price_corr"])
     
     st.write("Наиболее коррелирующие слова с рейтингом:")
-    st.dataframe(points_corr)
+    st.dataframe(result["points_corr"])
 
     # Scatter plots
     st.markdown("#### Scatter plots для корреляций")
-    scatter_words = list(price_corr.index[:5]) + list(points_corr.index[:5])  # Топ-5 коррелирующих слов с ценой и рейтингом
-    for word in scatter_words:
-        if word in word_df.columns:
+    scatter_words = result["scatter_words"]
+    if result["mode"] == "Плотность":
+        (price_hist, price_edges), (points_hist, points_edges) = result["price_hist"], result["points_hist"]
+        for i, word in enumerate(scatter_words):
             fig, ax = plt.subplots(1, 2, figsize=(14, 6))
-            
-            # Scatter с ценой
-            ax[0].scatter(word_df[word], word_df["price"], alpha=0.6, color="blue")
-            ax[0].set_title(f"Связь {word} с ценой")
-            ax[0].set_xlabel(f"Частота слова {word}")
-            ax[0].set_ylabel("Цена")
-            
-            # Scatter с рейтингом
-            ax[1].scatter(word_df[word], word_df["points"], alpha=0.6, color="green")
-            ax[1].set_title(f"Связь {word} с рейтингом")
-            ax[1].set_xlabel(f"Частота слова {word}")
-            ax[1].set_ylabel("Рейтинг")
-            
+            plot_density(ax[0], price_hist[i], price_edges, "Blues", f"Связь {word} с ценой", f"Частота слова {word}", "Цена")
+            plot_density(ax[1], points_hist[i], points_edges, "Greens", f"Связь {word} с рейтингом", f"Частота слова {word}", "Рейтинг")
             st.pyplot(fig)
+    else:
+        word_df = result["word_df"]
+        for word in scatter_words:
+            if word in word_df.columns:
+                fig, ax = plt.subplots(1, 2, figsize=(14, 6))
+                
+                # Scatter с ценой
+                ax[0].scatter(word_df[word], word_df["price"], alpha=0.6, color="blue")
+                ax[0].set_title(f"Связь {word} с ценой")
+                ax[0].set_xlabel(f"Частота слова {word}")
+                ax[0].set_ylabel("Цена")
+                
+                # Scatter с рейтингом
+                ax[1].scatter(word_df[word], word_df["points"], alpha=0.6, color="green")
+                ax[1].set_title(f"Связь {word} с рейтингом")
+                ax[1].set_xlabel(f"Частота слова {word}")
+                ax[1].set_ylabel("Рейтинг")
+                
+                st.pyplot(fig)
 
     # Корреляция с сортами винограда
     st.markdown("#### Анализ корреляции слов с сортами винограда")
-    if "variety" in df.columns:
-        varieties = df["variety"].fillna("Unknown")
-        word_df["variety"] = varieties.reset_index(drop=True)
-        word_variety_corr = (
-            word_df.groupby("variety")
-            .mean()
-            .corr(method="pearson")
-            .iloc[:, :-1]  # Убираем столбец variety
-        )
+    if "word_variety_corr" in result:
+        word_variety_corr = result["word_variety_corr"]
         
         st.markdown("Корреляция слов с сортами винограда (первые 10):")
         st.dataframe(word_variety_corr.head(10))
@@ -239,6 +422,9 @@ def main():
         # Добавление соотношения цена/качество
         df = add_price_quality_ratio(df)
 
+        if st.sidebar.checkbox("Память и время загрузки", value=False):
+            st.sidebar.dataframe(load_memory_report(file_path).style.format("{:.2f}"))
+
         # Фильтр по стране
         st.sidebar.markdown("### :globe_with_meridians: Фильтр по стране")
         unique_countries = df["country"].unique()
@@ -246,39 +432,78 @@ def main():
         country_filter = st.sidebar.multiselect(
             "Выберите страну:", options=unique_countries, default=default_countries
         )
-        if country_filter:
-            df = df[df["country"].isin(country_filter)]
+        categories = {"country": country_filter, **select_categories(df)}
+        engine = load_filter_engine(file_path)
+        if any(len(values) for values in categories.values()):
+            df = df[engine.mask(categories)]
+
+        # Поиск по словам в описании
+        df = filter_by_description(df, load_search_index(file_path))
 
         # Фильтрация по соотношению цена/качество
-        df = filter_by_price_quality(df)
+        df = filter_by_price_quality(df, engine, categories)
+
+        # Если поиск и диапазон цена/качество не убрали ни одной строки, выборка состоит из целых групп
+        # страна × сорт, и статистики собираются из частичных без прохода по строкам
+        statistics = load_group_statistics(file_path)
+        groups = group_mask(statistics, categories) if len(df) == engine.mask(categories).sum() else None
 
         # 1. Статистики для числовых переменных
-        calculate_numeric_statistics(df)
+        calculate_numeric_statistics(df, statistics, groups)
 
         # 2. Распределение для категориальных переменных
         explore_categorical_variables(df)
 
+        # Тяжёлые разделы считаются в фоне параллельно с остальными; на их месте — заглушки до готовности
+        jobs = session_jobs()
+        version = file_version(file_path)
+        term_counts = load_term_counts(file_path)
+        rows = df.index.to_numpy()
+        text_rows = rows[df["description"].notna().to_numpy()]
+        filter_key = rows_key(text_rows)
+        keys = set()
+
+        def start(name, key, render, function, *args):
+            keys.add(key)
+            job_section(name, jobs.submit(key, function, *args), render)
+
         # 3. Анализ описаний вин
         if st.sidebar.checkbox("Анализ описаний вин", value=True):
-            analyze_description(df)
+            start("description", ("description", version, rows_key(rows)), analyze_description,
+                  summarize_descriptions, term_counts, rows)
         
         # 4. Распределение points
         plot_points_distribution(df)
 
         # 5. Средние цены по странам
-        plot_average_price_by_country(df)
+        plot_average_price_by_country(df, statistics, groups)
 
         # 6. Распределение категорий и регионов
-        plot_category_region_distribution(df)
+        plot_category_region_distribution(df, file_path)
 
         # 7. Облако слов
         if st.sidebar.checkbox("Показать облако слов", value=True):
-            generate_wordcloud(df)
+            start("wordcloud", ("wordcloud", version, filter_key), generate_wordcloud,
+                  render_wordcloud, file_path, version, text_rows)
 
         # 8. Анализ корреляции
         st.sidebar.markdown("### :chart_with_upwards_trend: Анализ корреляции")
         if st.sidebar.checkbox("Анализ корреляции слов", value=True):
-            word_correlation_analysis(df)
+            mode = st.sidebar.radio("Графики связи слов:", ["Плотность", "Все точки"], horizontal=True)
+            n_varieties = n_words = 0
+            if "variety" in df.columns:
+                n_varieties = int(st.sidebar.number_input("Сортов в анализе корреляции (топ-K)", 2, 500, 20))
+                n_words = int(st.sidebar.number_input("Слов в анализе корреляции (топ-K)", 2, 500, 100))
+            if len(text_rows) == 0:
+                word_correlation_analysis(None)
+            else:
+                targets = df.loc[text_rows, ["price", "points"]].reset_index(drop=True)
+                start("correlation", ("correlation", version, filter_key, mode, n_varieties, n_words),
+                      word_correlation_analysis, correlate_words, file_path, term_counts, text_rows, targets,
+                      mode, n_varieties, n_words)
+
+        # Задачи прежних состояний фильтров больше не нужны
+        jobs.cancel_stale(keys)
 
     except Exception as e:
         st.error(f"Ошибка при обработке данных: {e}")
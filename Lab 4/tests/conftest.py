@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Модули работы импортируют друг друга по имени — папка Lab 4 должна быть в пути поиска
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,53 @@
+import pandas as pd
+import pytest
+
+from DataCleaning import clean_csv_chunked, clean_data, collect_statistics
+
+ROWS = [
+    # В первом блоке (chunksize=6) есть пропуск цены, в остальных — нет
+    ("Italy", "cherry oak", "90", "", "t0"),
+    ("France", "plum", "85", "10", "t1"),
+    ("Spain", "citrus", "bad", "20", "t2"),
+    ("France", "plum", "85", "10", "t1"),
+    ("", "berry", "88", "15", "t3"),
+    ("Italy", "spice", "90", "10", "t4"),
+    ("France", "plum", "85", "10", "t1"),
+    ("Spain", "citrus", "87", "20", "t5"),
+    ("Italy", "spice", "90", "10", "t4"),
+    ("US", "vanilla", "92", "30", "t6"),
+    ("US", "vanilla", "92", "30", "t6"),
+    ("Chile", "mineral", "84", "12", "t7"),
+    ("France", "plum", "85", "10", "t1"),
+]
+
+
+@pytest.fixture
+def dirty_csv(tmp_path):
+    path = tmp_path / "dirty.csv"
+    pd.DataFrame(ROWS, columns=["country", "description", "points", "price", "title"]).replace("", None).to_csv(path, index=False)
+    return str(path)
+
+
+@pytest.mark.parametrize("chunksize", [1, 2, 5, 6, 100])
+def test_chunked_cleaning_matches_clean_data(dirty_csv, tmp_path, chunksize):
+    expected = clean_data(pd.read_csv(dirty_csv)).reset_index(drop=True)
+
+    output = str(tmp_path / "clean.csv")
+    report = clean_csv_chunked(dirty_csv, output, collect_statistics(dirty_csv, chunksize=chunksize), chunksize=chunksize)
+    cleaned = pd.read_csv(output)
+
+    assert report["rows_written"] == len(expected) == len(cleaned)
+    assert report["duplicates"] == len(ROWS) - len(expected)
+    pd.testing.assert_frame_equal(cleaned, expected, check_dtype=False)
+
+
+def test_chunked_cleaning_writes_integer_columns_without_fraction(dirty_csv, tmp_path):
+    output = str(tmp_path / "clean.csv")
+    statistics = collect_statistics(dirty_csv, chunksize=5)
+    clean_csv_chunked(dirty_csv, output, statistics, chunksize=5)
+    cleaned = pd.read_csv(output, dtype=str)
+
+    # price: только целые значения и целая медиана; points: медиана 87.5 заполняет некорректное значение
+    assert statistics["integer_columns"] == ["price"]
+    assert not cleaned["price"].str.contains(".", regex=False).any()
+    assert cleaned["points"].str.contains(".", regex=False).all()
@@ -0,0 +1,46 @@
+import threading
+
+import pytest
+
+from Jobs import JobCancelled, JobScheduler, check_cancelled
+
+
+def wait_for_cancel(started):
+    started.set()
+    while True:
+        check_cancelled()
+        threading.Event().wait(0.01)
+
+
+def test_cancel_stale_interrupts_running_job():
+    jobs = JobScheduler(max_workers=1)
+    started = threading.Event()
+    running = jobs.submit("old", wait_for_cancel, started)
+    queued = jobs.submit("queued", len, [])
+    assert started.wait(5)
+
+    jobs.cancel_stale({"new"})
+
+    with pytest.raises(JobCancelled):
+        running.result(timeout=5)
+    assert queued.cancelled()
+    assert not jobs.results
+    assert jobs.submit("old", len, [1, 2]).result(timeout=5) == 2
+
+
+def test_failed_job_is_not_resubmitted():
+    jobs = JobScheduler(max_workers=1)
+    calls = []
+
+    def fail():
+        calls.append(1)
+        raise ValueError("broken")
+
+    future = jobs.submit("key", fail)
+    assert isinstance(future.exception(timeout=5), ValueError)
+    assert jobs.submit("key", fail) is future
+    assert len(calls) == 1
+
+
+def test_check_cancelled_outside_jobs_is_noop():
+    check_cancelled()
@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+
+from SearchIndex import bm25_search, boolean_search, build_inverted_index, parse_query
+from TermCounts import build_term_counts
+
+DESCRIPTIONS = [
+    "Cherry and oak on the nose.",
+    "Bright cherry, no oak at all? Oak!",
+    "Citrus and mineral finish.",
+    "Ripe plum with a touch of oak.",
+    "Cherry, plum and spice.",
+]
+
+
+@pytest.fixture(scope="module")
+def index():
+    return build_inverted_index(build_term_counts(DESCRIPTIONS, max_workers=1))
+
+
+def rows_with(*words):
+    return {row for row, text in enumerate(DESCRIPTIONS) if any(word in text.lower() for word in words)}
+
+
+ALL_ROWS = set(range(len(DESCRIPTIONS)))
+
+
+@pytest.mark.parametrize("query, expected", [
+    ("cherry OR", [(["cherry"], [])]),
+    ("OR cherry", [(["cherry"], [])]),
+    ("cherry or plum", [(["cherry"], []), (["plum"], [])]),
+    ("cherry OR OR plum", [(["cherry"], []), (["plum"], [])]),
+    ("-oak", [([], ["oak"])]),
+    ("NOT oak", [([], ["oak"])]),
+    ("OR", []),
+    ("", []),
+])
+def test_parse_query(query, expected):
+    assert parse_query(query) == expected
+
+
+@pytest.mark.parametrize("query, expected", [
+    ("cherry OR", rows_with("cherry")),
+    ("cherry or plum", rows_with("cherry", "plum")),
+    ("cherry plum", rows_with("cherry") & rows_with("plum")),
+    ("-oak", ALL_ROWS - rows_with("oak")),
+    ("NOT oak", ALL_ROWS - rows_with("oak")),
+    ("citrus OR -oak", rows_with("citrus") | (ALL_ROWS - rows_with("oak"))),
+    ("cherry -oak", rows_with("cherry") - rows_with("oak")),
+])
+def test_boolean_search(index, query, expected):
+    assert set(boolean_search(index, query).tolist()) == expected
+
+
+def test_negation_only_query_respects_allowed_rows(index):
+    allowed = np.array([0, 2, 3])
+    assert boolean_search(index, "-oak", allowed).tolist() == [2]
+    assert bm25_search(index, "-oak", allowed).index.tolist() == [2]
+
+
+def test_bm25_drops_excluded_rows(index):
+    assert set(bm25_search(index, "cherry -oak").index) == rows_with("cherry") - rows_with("oak")
@@ -0,0 +1,23 @@
+import numpy as np
+import pandas as pd
+
+from TermCounts import build_term_counts, term_correlations
+
+
+def test_rare_words_are_not_correlated_by_default():
+    rng = np.random.default_rng(0)
+    rows = 2000
+    common = rng.integers(0, 3, rows)
+    price = common * 10 + rng.normal(0, 5, rows)
+    descriptions = ["oak " * count + "wine" for count in common]
+    # Слово есть только в шести самых дорогих описаниях: его корреляция держится на шести документах
+    for row in np.argsort(price)[-6:]:
+        descriptions[row] += " rare"
+    term_counts = build_term_counts(descriptions, max_workers=1)
+    targets = pd.DataFrame({"price": price})
+
+    default = term_correlations(term_counts, np.arange(rows), targets)
+    assert "oak" in default.index and "rare" not in default.index
+
+    absolute = term_correlations(term_counts, np.arange(rows), targets, min_df=5)
+    assert "rare" in absolute.index
@@ -0,0 +1,210 @@
+"""
+Замеряемые функции лабораторных работ. Каждый случай — (работа, наибольший масштаб по умолчанию, prepare):
+prepare(directory, scale) готовит входные данные вне замера и возвращает функцию без аргументов,
+которая вызывает настоящий код работы. Время замеряется только у этой функции.
+"""
+import importlib.util
+import os
+import re
+import sys
+from functools import lru_cache
+
+import synthetic
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def lab_module(lab, name):
+    """
+    Импортирует модуль работы по пути к файлу. Папка работы добавляется в sys.path для импорта
+    соседних модулей, а сам модуль получает имя с префиксом работы: main.py из Lab 3 и Lab 4 не смешиваются.
+    """
+    directory = os.path.join(ROOT, lab)
+    if directory not in sys.path:
+        sys.path.append(directory)
+    alias = re.sub(r'\W+', '_', f'{lab}_{name}').lower()
+    if alias not in sys.modules:
+        spec = importlib.util.spec_from_file_location(alias, os.path.join(directory, f'{name}.py'))
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[alias] = module
+        try:
+            spec.loader.exec_module(module)
+        except BaseException:
+            del sys.modules[alias]
+            raise
+    return sys.modules[alias]
+
+
+@lru_cache(maxsize=None)
+def dataset(kind, directory, scale):
+    """Синтетический набор данных (путь или таблица); генерируется один раз на масштаб."""
+    generators = {
+        'energy_csv': lambda: synthetic.write_energy_csv(directory, scale),
+        'population_xlsx': lambda: synthetic.write_population_workbook(directory, scale),
+        'election_stations': lambda: synthetic.election_stations(scale),
+        'coordinates': lambda: synthetic.coordinates_frame(scale),
+        'cams_grids': lambda: synthetic.write_cams_grids(directory, scale),
+        'pollution': lambda: synthetic.pollution_frame(scale),
+        'wine_dirty_csv': lambda: synthetic.write_wine_csv(directory, scale, dirty=True),
+        'wine_csv': lambda: synthetic.write_wine_csv(directory, scale),
+    }
+    return generators[kind]()
+
+
+# Lab 1: чтение CSV энергосистемы и группировки разделов панели
+
+def lab1_read_data(directory, scale):
+    lab1 = lab_module('Lab 1', 'Lab1')
+    path = dataset('energy_csv', directory, scale)
+    return lambda: lab1.read_data(path)
+
+
+def lab1_section(name):
+    def prepare(directory, scale):
+        lab1 = lab_module('Lab 1', 'Lab1')
+        data = lab1.read_data(dataset('energy_csv', directory, scale))
+        compute, _ = lab1.sections[name]
+        return lambda: compute(data, lab1.energy_types)
+    return prepare
+
+
+# Lab 2: потоковое чтение книги населения, кубы населения и выборов, сопоставление координат
+
+POPULATION_COLUMNS = ['Localitate', 'Vârstă', 'Gen', 'Valoare']
+POPULATION_DIMENSIONS = ['Localitate', 'Vârstă', 'Gen']
+
+
+def read_population(directory, scale):
+    excel_stream = lab_module('Lab 2', 'ExcelStream')
+    path = dataset('population_xlsx', directory, scale)
+    # Те же параметры, что и при чтении книги населения в Lab2.py
+    return excel_stream.read_excel_streaming(path, POPULATION_COLUMNS, skiprows=3, usecols='A:D',
+                                             ffill=['Localitate', 'Vârstă'], numeric=['Valoare'])
+
+
+def lab2_read_excel_streaming(directory, scale):
+    dataset('population_xlsx', directory, scale)
+    return lambda: read_population(directory, scale)
+
+
+def lab2_population_cube(directory, scale):
+    population_cube = lab_module('Lab 2', 'PopulationCube')
+    population = read_population(directory, scale)
+
+    def run():
+        table, _ = population_cube.build_population_table(population, POPULATION_DIMENSIONS,
+                                                          {'Vârstă': synthetic.AGE_GROUPS})
+        return population_cube.build_cube(table)
+    return run
+
+
+def lab2_election_cube(directory, scale):
+    election_cube = lab_module('Lab 2', 'ElectionCube')
+    stations = dataset('election_stations', directory, scale)
+    return lambda: election_cube.build_election_cube(
+        stations, synthetic.CANDIDATES, 'Total voturi valabil exprimate',
+        'Numărul de alegători care au participat la votare', 'Alegători înscriși')
+
+
+def lab2_match_coordinates(directory, scale):
+    coordinate_index = lab_module('Lab 2', 'CoordinateIndex')
+    coordinates = dataset('coordinates', directory, scale)
+    localities = dataset('election_stations', directory, scale)['Localitate']
+
+    def run():
+        index = coordinate_index.build_coordinate_index(coordinates)
+        return coordinate_index.match_coordinates(localities, index)
+    return run
+
+
+# Lab 3: извлечение сеток NetCDF и фильтрация объединённой таблицы
+
+def lab3_extract_nc_to_dataframe(directory, scale):
+    create_table = lab_module('Lab 3/CreateTables', 'CreateTableSudanAerosol_2003_2018')
+    folder = dataset('cams_grids', directory, scale)
+    return lambda: create_table.extract_nc_to_dataframe(folder)
+
+
+def lab3_filter_data_by_date_and_coords(directory, scale):
+    lab3 = lab_module('Lab 3', 'main')
+    df = dataset('pollution', directory, scale)
+    return lambda: lab3.filter_data_by_date_and_coords(df, '2008-01-01', '2015-12-31', 10.0, 18.0, 24.0, 35.0)
+
+
+def lab3_calculate_statistics(directory, scale):
+    lab3 = lab_module('Lab 3', 'main')
+    df = dataset('pollution', directory, scale)
+    return lambda: lab3.calculate_statistics(df, synthetic.POLLUTANTS['aerosol'])
+
+
+# Lab 4: очистка, частоты слов, анализ описаний и корреляции слов
+
+def lab4_clean_data(directory, scale):
+    import pandas as pd
+
+    data_cleaning = lab_module('Lab 4', 'DataCleaning')
+    df = pd.read_csv(dataset('wine_dirty_csv', directory, scale))
+    return lambda: data_cleaning.clean_data(df.copy())
+
+
+def lab4_clean_csv_chunked(directory, scale):
+    data_cleaning = lab_module('Lab 4', 'DataCleaning')
+    path = dataset('wine_dirty_csv', directory, scale)
+    output_path = os.path.join(directory, f'wine-cleaned-{scale}x.csv')
+
+    def run():
+        statistics = data_cleaning.collect_statistics(path)
+        return data_cleaning.clean_csv_chunked(path, output_path, statistics)
+    return run
+
+
+def lab4_build_term_counts(directory, scale):
+    term_counts = lab_module('Lab 4', 'TermCounts')
+    dashboard = lab_module('Lab 4', 'main')
+    descriptions = dashboard.load_data(dataset('wine_csv', directory, scale))['description']
+    return lambda: term_counts.build_term_counts(descriptions)
+
+
+def dashboard_inputs(directory, scale):
+    """Данные панели Lab 4 так же, как их готовит main(): таблица, частоты слов и строки с описаниями."""
+    dashboard = lab_module('Lab 4', 'main')
+    path = dataset('wine_csv', directory, scale)
+    df = dashboard.load_data(path)
+    term_counts = dashboard.load_term_counts(path)
+    rows = df.index.to_numpy()
+    return dashboard, path, df, term_counts, rows[df['description'].notna().to_numpy()]
+
+
+def lab4_analyze_description(directory, scale):
+    dashboard, _, _, term_counts, rows = dashboard_inputs(directory, scale)
+    return lambda: dashboard.summarize_descriptions(term_counts, rows)
+
+
+def lab4_word_correlation_analysis(directory, scale):
+    dashboard, path, df, term_counts, rows = dashboard_inputs(directory, scale)
+    targets = df.loc[rows, ['price', 'points']].reset_index(drop=True)
+
+    def run():
+        # Корреляция с сортами кэшируется панелью — без очистки кэша замерялся бы только поиск в нём
+        dashboard.load_variety_correlation.clear()
+        return dashboard.correlate_words(path, term_counts, rows, targets, 'Плотность', 20, 100)
+    return run
+
+
+CASES = {
+    'lab1/read_data': ('Lab 1', 1000, lab1_read_data),
+    **{f'lab1/{name}': ('Lab 1', 1000, lab1_section(name)) for name in
+       ['line', 'pie', 'hourly_peaks', 'daily_peaks', 'monthly_peaks', 'hourly_series', 'daily_series', 'monthly_series']},
+    'lab2/read_excel_streaming': ('Lab 2', 100, lab2_read_excel_streaming),
+    'lab2/population_cube': ('Lab 2', 100, lab2_population_cube),
+    'lab2/election_cube': ('Lab 2', 1000, lab2_election_cube),
+    'lab2/match_coordinates': ('Lab 2', 100, lab2_match_coordinates),
+    'lab3/extract_nc_to_dataframe': ('Lab 3', 10, lab3_extract_nc_to_dataframe),
+    'lab3/filter_data_by_date_and_coords': ('Lab 3', 100, lab3_filter_data_by_date_and_coords),
+    'lab3/calculate_statistics': ('Lab 3', 100, lab3_calculate_statistics),
+    'lab4/clean_data': ('Lab 4', 100, lab4_clean_data),
+    'lab4/clean_csv_chunked': ('Lab 4', 1000, lab4_clean_csv_chunked),
+    'lab4/build_term_counts': ('Lab 4', 100, lab4_build_term_counts),
+    'lab4/analyze_description': ('Lab 4', 1000, lab4_analyze_description),
+    'lab4/word_correlation_analysis': ('Lab 4', 100, lab4_word_correlation_analysis),
+}
@@ -0,0 +1,162 @@
+"""
+Замеры функций всех лабораторных работ на синтетических данных, без запуска Streamlit.
+
+    python benchmarks/run.py                          # масштабы 1 и 10
+    python benchmarks/run.py --scales 1 10 100 1000 --save baseline
+    python benchmarks/run.py --compare baseline       # код выхода 1, если что-то замедлилось
+
+Для каждого случая и масштаба: время (минимум и медиана из --repeat запусков) и пик памяти
+по tracemalloc в отдельном запуске (tracemalloc замедляет код, поэтому время замеряется без него).
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+from streamlit import config, logger
+
+from cases import CASES, dataset
+
+BASELINE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baselines')
+DEFAULT_SCALES = [1, 10]
+DEFAULT_REPEAT = 3
+DEFAULT_TOLERANCE = 1.25  # Замедление больше чем в 1.25 раза считается регрессией
+
+
+def measure(run, repeat):
+    """Время (минимум и медиана, секунды) и пик памяти Python-кода и numpy (МБ) одного вызова."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - start)
+    tracemalloc.start()
+    try:
+        run()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return min(times), statistics.median(times), peak / 2 ** 20
+
+
+def run_cases(names, scales, repeat, directory, no_limit=False):
+    results = []
+    for scale in scales:
+        for name in names:
+            lab, max_scale, prepare = CASES[name]
+            row = {'case': name, 'scale': scale}
+            if scale > max_scale and not no_limit:
+                results.append({**row, 'status': f'пропущен: масштаб больше {max_scale} (--no-limit)'})
+                continue
+            try:
+                row['min_s'], row['median_s'], row['peak_mb'] = measure(prepare(directory, scale), repeat)
+                row['status'] = 'ok'
+            except ImportError as e:
+                row['status'] = f'пропущен: {e}'
+            except Exception as e:
+                row['status'] = f'ошибка: {e!r}'
+            print(f"{name} ×{scale}: {row['status']}"
+                  + (f", {row['min_s']:.4f} с, {row['peak_mb']:.1f} МБ" if row['status'] == 'ok' else ''),
+                  file=sys.stderr)
+            results.append(row)
+        # Данные следующего масштаба больше — предыдущие (и кэши панелей с ними) не держим в памяти
+        dataset.cache_clear()
+        st.cache_data.clear()
+        st.cache_resource.clear()
+    return results
+
+
+def environment():
+    return {
+        'date': datetime.datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+    }
+
+
+def save_baseline(name, results):
+    os.makedirs(BASELINE_DIR, exist_ok=True)
+    path = os.path.join(BASELINE_DIR, f'{name}.json')
+    with open(path, 'w', encoding='utf-8') as file:
+        json.dump({'environment': environment(), 'results': results}, file, ensure_ascii=False, indent=2)
+    return path
+
+
+def compare(results, name, tolerance):
+    """Отношение времени к сохранённому замеру по (случай, масштаб); регрессии — отношения больше tolerance."""
+    with open(os.path.join(BASELINE_DIR, f'{name}.json'), encoding='utf-8') as file:
+        baseline = pd.DataFrame(json.load(file)['results'])
+    current = pd.DataFrame(results)
+    columns = ['case', 'scale', 'min_s', 'peak_mb']
+    table = current[current['status'] == 'ok'][columns].merge(
+        baseline[baseline['status'] == 'ok'][columns], on=['case', 'scale'], suffixes=('', '_baseline'))
+    table['time_ratio'] = table['min_s'] / table['min_s_baseline']
+    table['memory_ratio'] = table['peak_mb'] / table['peak_mb_baseline'].replace(0, np.nan)
+    table['regression'] = table['time_ratio'] > tolerance
+    return table
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Замеры функций лабораторных работ на синтетических данных.')
+    parser.add_argument('--scales', type=int, nargs='+', default=DEFAULT_SCALES, help='масштабы данных (1, 10, 100, 1000)')
+    parser.add_argument('--cases', nargs='+', default=[], help='подстроки имён случаев, например lab2 или correlation')
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT)
+    parser.add_argument('--no-limit', action='store_true', help='не пропускать масштабы больше предела случая')
+    parser.add_argument('--save', metavar='NAME', help='сохранить результаты в baselines/NAME.json')
+    parser.add_argument('--compare', metavar='NAME', help='сравнить с baselines/NAME.json')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument('--workdir', help='папка для синтетических файлов (по умолчанию временная)')
+    args = parser.parse_args(argv)
+
+    names = [name for name in CASES if not args.cases or any(part in name for part in args.cases)]
+    if not names:
+        parser.error(f'нет случаев для {args.cases}; доступны: {", ".join(CASES)}')
+
+    # Без сервера Streamlit кэши работают в памяти, а вызовы st.* только пишут предупреждения в лог.
+    # Уровень лога задаётся после разбора конфигурации, иначе разбор вернёт его к info
+    config.get_option('logger.level')
+    logger.set_log_level('error')
+
+    directory = args.workdir or tempfile.mkdtemp(prefix='lab-benchmarks-')
+    os.makedirs(directory, exist_ok=True)
+    cwd = os.getcwd()
+    os.chdir(directory)  # Сохранённые индексы Lab 4 (.snapshots) создаются рядом с данными
+    try:
+        results = run_cases(names, args.scales, args.repeat, directory, args.no_limit)
+    finally:
+        os.chdir(cwd)
+        if not args.workdir:
+            shutil.rmtree(directory, ignore_errors=True)
+
+    table = pd.DataFrame(results).set_index(['case', 'scale']).reindex(columns=['min_s', 'median_s', 'peak_mb', 'status'])
+    with pd.option_context('display.max_rows', None, 'display.width', 200):
+        print(table.to_string(float_format='{:.4f}'.format))
+
+    if args.save:
+        print(f'Сохранено: {save_baseline(args.save, results)}')
+    if args.compare:
+        comparison = compare(results, args.compare, args.tolerance)
+        with pd.option_context('display.max_rows', None, 'display.width', 200):
+            print(comparison.to_string(index=False, float_format='{:.3f}'.format))
+        regressions = comparison[comparison['regression']]
+        if len(regressions):
+            print(f'Замедление больше чем в {args.tolerance} раза: {", ".join(regressions["case"] + " ×" + regressions["scale"].astype(str))}')
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
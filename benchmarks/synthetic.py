@@ -0,0 +1,210 @@
+"""
+Детерминированные синтетические данные по схемам всех лабораторных работ.
+Масштаб 1 соответствует размеру файлов из репозитория, масштаб N — в N раз больше строк.
+Одинаковые (масштаб, seed) всегда дают одинаковые файлы.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+# Размеры при масштабе 1 — как у файлов в репозитории
+ENERGY_ROWS = 1400
+POPULATION_LOCALITIES = 39
+ELECTION_STATIONS = 2219
+ELECTION_CIRCUMSCRIPTIONS = 37
+GRID_STEP = 3.0              # Шаг сетки CAMS в градусах (≈50 узлов внутри границ Судана)
+WINE_ROWS = 2000
+
+ENERGY_TYPES = ['carbune', 'hidro', 'hidrocarburi', 'nuclear', 'eolian', 'fotovolt', 'biomasa']
+AGE_GROUPS = ['0-4', '5-9', '10-14', '15-19', '20-24', '25-29', '30-34', '35-39',
+              '40-44', '45-49', '50-54', '55-59', '60-64', '65-69', '70-74', '75 peste']
+CANDIDATES = ['Alexandr Stoianoglo', 'Maia Sandu', 'Renato Usatii', 'Vasile Tarlev', 'Irina Vlah', 'Ion Chicu',
+              'Andrei Nastase', 'Octavian Ticu', 'Victoria Furtuna', 'Tudor Ulianovschi', 'Natalia Morari']
+LOCALITY_PREFIXES = ['com.', 's.', 'or.', 'mun.']
+POLLUTANTS = {
+    'aerosol': 'Радиационное воздействие аэрозолей с излучением',
+    'dioxide': 'Радиационное воздействие углекислого газа',
+    'methane': 'Радиационное воздействие метана',
+}
+YEARS = range(2003, 2019)
+COUNTRIES = ['US', 'France', 'Italy', 'Spain', 'Portugal', 'Chile', 'Argentina', 'Austria', 'Australia', 'Germany']
+CATEGORIES = ['Red', 'White', 'Rose', 'Sparkling', 'Dessert']
+TASTING_WORDS = ['cherry', 'oak', 'vanilla', 'tannins', 'acidity', 'berry', 'citrus', 'spice', 'finish', 'ripe',
+                 'plum', 'earthy', 'crisp', 'mineral', 'toast', 'floral', 'peach', 'leather', 'smoke', 'honey']
+
+
+def rng_for(name, scale, seed):
+    """Отдельный генератор на каждый набор данных, чтобы наборы не зависели друг от друга."""
+    return np.random.default_rng([seed, scale, sum(map(ord, name))])
+
+
+def energy_frame(scale, seed=0):
+    """Таблица энергосистемы (Lab 1): случайные моменты 2022–2024 годов и выработка по типам."""
+    rng = rng_for('energy', scale, seed)
+    rows = ENERGY_ROWS * scale
+    seconds = rng.integers(0, 3 * 365 * 24 * 3600, rows)
+    data = {'date': (pd.Timestamp('2022-01-01') + pd.to_timedelta(seconds, unit='s')).strftime('%Y-%m-%d %H:%M:%S')}
+    for energy_type in ENERGY_TYPES:
+        data[energy_type] = rng.integers(0, 2500, rows)
+    data['productie'] = sum(data[energy_type] for energy_type in ENERGY_TYPES)
+    data['consum'] = data['productie'] + rng.integers(-2000, 2000, rows)
+    data['sold'] = data['productie'] - data['consum']
+    return pd.DataFrame(data)[['date', 'carbune', 'consum', 'hidro', 'hidrocarburi', 'nuclear', 'eolian',
+                               'productie', 'fotovolt', 'biomasa', 'sold']]
+
+
+def write_energy_csv(directory, scale, seed=0):
+    path = os.path.join(directory, f'energy-{scale}x.csv')
+    energy_frame(scale, seed).to_csv(path, index=False)
+    return path
+
+
+def locality_names(count):
+    return [f'{LOCALITY_PREFIXES[i % len(LOCALITY_PREFIXES)]} Localitate{i}' for i in range(count)]
+
+
+def write_population_workbook(directory, scale, seed=0):
+    """
+    Книга населения (Lab 2) в формате статистического бюро: три строки заголовка, затем
+    населённый пункт и возраст только в первой строке своей группы (ниже пусто), пол и значение.
+    """
+    import openpyxl
+
+    rng = rng_for('population', scale, seed)
+    path = os.path.join(directory, f'population-{scale}x.xlsx')
+    workbook = openpyxl.Workbook(write_only=True)
+    worksheet = workbook.create_sheet()
+    worksheet.append(['Populatia cu resedinta obisnuita, la inceputul anului pe Raioane, Grupe de virste, Sexe și Ani'])
+    worksheet.append([])
+    worksheet.append([None, None, None, 2024])
+    for locality in locality_names(POPULATION_LOCALITIES * scale):
+        values = rng.integers(100, 20000, 2 * len(AGE_GROUPS))
+        for i, age in enumerate(AGE_GROUPS):
+            worksheet.append([locality if i == 0 else None, age, 'Barbati', int(values[2 * i])])
+            worksheet.append([None, None, 'Femei', int(values[2 * i + 1])])
+    workbook.save(path)
+    return path
+
+
+def election_stations(scale, seed=0):
+    """Секции голосования (Lab 2) в виде, в котором их отдаёт чтение книги выборов."""
+    rng = rng_for('election', scale, seed)
+    stations = ELECTION_STATIONS * scale
+    localities = locality_names(max(stations // 3, 1))
+    locality = rng.integers(0, len(localities), stations)
+    votes = rng.poisson(rng.uniform(5, 120, len(CANDIDATES)), (stations, len(CANDIDATES)))
+    data = pd.DataFrame(votes, columns=CANDIDATES).astype('float64')
+    data.insert(0, 'Localitate', np.asarray(localities)[locality])
+    data['Nr. secție'] = np.arange(stations) % 1000 + 1
+    data['Total voturi valabil exprimate'] = votes.sum(axis=1)
+    data['Numărul de alegători care au participat la votare'] = data['Total voturi valabil exprimate'] + rng.integers(0, 20, stations)
+    data['Alegători înscriși'] = data['Numărul de alegători care au participat la votare'] * rng.uniform(1.2, 2.5, stations)
+    circumscription = locality * ELECTION_CIRCUMSCRIPTIONS // len(localities) + 1
+    data['Circumscripție'] = [f'{number} - Circumscripţia electorală nr. {number}' for number in circumscription]
+    return data
+
+
+def coordinates_frame(scale, seed=0):
+    """Координаты населённых пунктов (coordinates.json): другие префиксы и регистр, часть названий с опечаткой."""
+    rng = rng_for('coordinates', scale, seed)
+    names = pd.Series(locality_names(max(ELECTION_STATIONS * scale // 3, 1)))
+    cities = names.str.replace(r'^\w+\.', 'com.', regex=True).str.upper()
+    typos = rng.random(len(cities)) < 0.05
+    cities[typos] = cities[typos] + 'A'
+    return pd.DataFrame({'city': cities, 'latitude': rng.uniform(45.5, 48.5, len(cities)),
+                         'longitude': rng.uniform(26.6, 30.1, len(cities))})
+
+
+def write_cams_grids(directory, scale, seed=0, variable='aod550'):
+    """
+    Сетки в стиле CAMS (Lab 3): по файлу NetCDF на год, 12 месяцев, широта по убыванию,
+    долгота в диапазоне [0, 360). Шаг сетки уменьшается так, чтобы узлов было в scale раз больше.
+    Файлы NetCDF3 пишутся средствами scipy, их читает и netCDF4.
+    """
+    from scipy.io import netcdf_file
+
+    rng = rng_for('cams', scale, seed)
+    folder = os.path.join(directory, f'cams-{scale}x')
+    os.makedirs(folder, exist_ok=True)
+    step = GRID_STEP / np.sqrt(scale)
+    latitudes = np.arange(30.0, 0.0 - step / 2, -step)
+    longitudes = np.arange(15.0, 45.0 + step / 2, step)
+    for year in YEARS:
+        months = pd.date_range(f'{year}-01-01', periods=12, freq='MS') + pd.Timedelta(days=15)
+        hours = (months - pd.Timestamp('1900-01-01')) // pd.Timedelta(hours=1)
+        with netcdf_file(os.path.join(folder, f'{variable}_{year}.nc'), 'w') as dataset:
+            dataset.createDimension('time', len(hours))
+            dataset.createDimension('latitude', len(latitudes))
+            dataset.createDimension('longitude', len(longitudes))
+            time = dataset.createVariable('time', 'i4', ('time',))
+            time[:] = np.asarray(hours, dtype=np.int32)
+            time.units = 'hours since 1900-01-01 00:00:00.0'
+            time.calendar = 'gregorian'
+            dataset.createVariable('latitude', 'f4', ('latitude',))[:] = latitudes
+            dataset.createVariable('longitude', 'f4', ('longitude',))[:] = longitudes % 360
+            values = dataset.createVariable(variable, 'f4', ('time', 'latitude', 'longitude'))
+            values[:] = rng.gamma(2.0, 0.2, (len(hours), len(latitudes), len(longitudes))).astype(np.float32)
+    return folder
+
+
+def pollution_frame(scale, seed=0):
+    """Объединённая таблица поллютантов (Lab 3) после чтения: время, широта, долгота и три показателя."""
+    rng = rng_for('pollution', scale, seed)
+    step = GRID_STEP / np.sqrt(scale)
+    latitudes = np.arange(9.0, 22.0, step)
+    longitudes = np.arange(21.0, 39.0, step)
+    times = pd.date_range('2003-01-01', '2018-12-01', freq='MS') + pd.Timedelta(days=15)
+    grid = pd.MultiIndex.from_product([times, latitudes, longitudes], names=['Время', 'Широта', 'Долгота'])
+    data = grid.to_frame(index=False)
+    data['Координаты Судана (широта, долгота)'] = (data['Широта'].map('{:.2f}'.format) + ', '
+                                                   + data['Долгота'].map('{:.2f}'.format))
+    for name, column in POLLUTANTS.items():
+        data[column] = rng.gamma(2.0, 0.2 if name == 'aerosol' else 0.8, len(data))
+    return data
+
+
+def wine_frame(scale, seed=0, dirty=False):
+    """
+    Отзывы о винах (Lab 4). Описания — слова из небольшого словаря дегустации и длинного хвоста
+    редких слов с частотами по закону Ципфа; цена и рейтинг зависят от нескольких слов.
+    dirty=True добавляет пропуски, нечисловые баллы и точные дубликаты, как в исходном файле.
+    """
+    rng = rng_for('wine', scale, seed)
+    rows = WINE_ROWS * scale
+    vocabulary = np.array(TASTING_WORDS + [f'w{i}' for i in range(5000)])
+    lengths = rng.integers(15, 45, rows)
+    words = vocabulary[np.minimum(rng.zipf(1.3, lengths.sum()) - 1, len(vocabulary) - 1)]
+    descriptions = np.array([' '.join(chunk) + '.' for chunk in np.split(words, np.cumsum(lengths)[:-1])], dtype=object)
+    premium = pd.Series(descriptions).str.contains('leather|honey', regex=True).to_numpy()
+    points = np.clip(np.round(rng.normal(87, 3, rows) + 2 * premium), 80, 100)
+    price = np.round(np.exp(rng.normal(3.2, 0.6, rows) + 0.4 * premium))
+    varieties = np.array([f'Variety {i}' for i in range(40 + scale)])
+    regions = np.array([f'Region {i}' for i in range(60 + 2 * scale)])
+    country_weights = np.linspace(2, 0.2, len(COUNTRIES))
+    data = pd.DataFrame({
+        'country': rng.choice(COUNTRIES, rows, p=country_weights / country_weights.sum()),
+        'description': descriptions,
+        'points': points,
+        'price': price,
+        'alcohol': np.round(rng.normal(13.3, 1.0, rows), 1),
+        'category': rng.choice(CATEGORIES, rows, p=[0.5, 0.3, 0.1, 0.06, 0.04]),
+        'variety': varieties[np.minimum(rng.zipf(1.6, rows) - 1, len(varieties) - 1)],
+        'region_1': regions[rng.integers(0, len(regions), rows)],
+        'title': [f'Wine {i}' for i in range(rows)],
+        'winery': [f'Winery {i}' for i in rng.integers(0, max(rows // 10, 1), rows)],
+    })
+    if not dirty:
+        return data
+    data['points'] = data['points'].astype(int).astype(str)
+    data.loc[rng.random(rows) < 0.02, 'points'] = 'bad'
+    for column, share in [('price', 0.07), ('country', 0.01), ('region_1', 0.15), ('points', 0.01)]:
+        data.loc[rng.random(rows) < share, column] = np.nan
+    duplicates = data.sample(frac=0.05, random_state=seed)
+    return pd.concat([data, duplicates], ignore_index=True).sample(frac=1, random_state=seed).reset_index(drop=True)
+
+
+def write_wine_csv(directory, scale, seed=0, dirty=False):
+    path = os.path.join(directory, f'wine-{"dirty" if dirty else "clean"}-{scale}x.csv')
+    wine_frame(scale, seed, dirty).to_csv(path, index=False)
+    return path